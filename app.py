@@ -1,7 +1,9 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import random
 import time
+from datetime import datetime
 
 import sys
 import os
@@ -12,6 +14,11 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'utils')
 
 
 from utils.common_utils import (initialize_session,
+                                get_session_vocabulary,
+                                get_session_deck_id,
+                                get_deck_sources,
+                                deck_label,
+                                get_user_id,
                                 handle_page_navigation,
                                 get_credentials_from_secret_manager,
                                 load_google_credentials,
@@ -34,16 +41,51 @@ from utils.review_utils import ( load_incorrect_words_from_drive,
                                  get_options,
                                  check_answer_and_update,
                                  move_to_next_word_and_update,
+                                 save_review_answer,
     
     
+)
+from utils.storage_utils import (flush_storage,
+)
+from utils.index_utils import (get_marked_index,
+                               get_incorrect_index,
+                               sync_session_indexes,
+                               is_syncing,
+                               reset_session_indexes,
 )
 from utils.checklist_utils import ( load_marked_words_from_drive,
 	                                delete_marked_word_from_drive,
-    
+                                    add_marked_words_to_drive,
+                                    delete_marked_words_from_drive,
+                                    get_checklist_page_size,
+                                    get_page,
+                                    get_selected_words,
+                                    toggle_selected_word,
 )
 
 from utils.visual_utils import (show_progress_summary,
 )
+from utils.io_utils import (show_sync_status,
+)
+from utils.history_utils import (show_answer_history,
+)
+from utils.quiz_utils import (DISTRACTOR_MODES,
+                              get_distractor_mode,
+)
+from utils.search_utils import (get_search_index,
+)
+from utils.prefetch_utils import (prefetch_learning_questions,
+                                  prefetch_review_questions,
+                                  release_review_questions,
+                                  reset_question_buffers,
+)
+from utils.metrics_utils import (PROCESS_METRICS,
+                                 get_session_metrics,
+                                 trace,
+                                 to_prometheus,
+                                 to_json,
+                                 export_metrics,
+)
 
 
 
@@ -51,33 +93,81 @@ from utils.visual_utils import (show_progress_summary,
 # 세션 상태 초기화
 if "page" not in st.session_state:
     st.session_state.page = "Home"
-if "marked_words" not in st.session_state:
-    st.session_state.marked_words = []
-if "records" not in st.session_state:
-    st.session_state.records = []
 if "current_index" not in st.session_state:
     st.session_state.current_index = 0
 if "known_words" not in st.session_state:
     st.session_state.known_words = []
-if "unknown_words" not in st.session_state:  
-    st.session_state.unknown_words = []
-if "filtered_data" not in st.session_state:
-    st.session_state.filtered_data = pd.DataFrame()
+if "selected_ids" not in st.session_state:
+    st.session_state.selected_ids = np.empty(0, dtype=np.int32)  # 선택한 Day의 단어 id (공유 단어장의 행 번호)
 
 
 
-@st.cache_data
-def load_data(file_url):
-    return pd.read_excel(file_url)
-
-# GitHub에서 파일 URL
-file_url = 'https://raw.githubusercontent.com/blue-915/project/a478d554ddf9ff9b522ef24432c5b8b3d2147de1/os/%EB%85%B8%EB%9E%AD%EC%9D%B4%20%EC%A0%84%EB%A9%B4%EA%B0%9C%EC%A0%95%ED%8C%90.xlsx'
-data = load_data(file_url)
+# 단어장 목록 (기본값은 GitHub의 토익 단어장, VOCAB_SOURCES/VOCAB_SOURCE 환경 변수로 URL이나 로컬 xlsx/CSV 경로 지정)
+deck_sources = get_deck_sources()
+if st.session_state.get("file_url") not in deck_sources:
+    st.session_state.file_url = deck_sources[0]
+# 단어장은 스크립트를 불러올 때가 아니라 페이지가 필요로 할 때 불러옴 (내용 해시마다 한 벌을 모든 세션이 공유)
 
 # 페이지 이동 함수
 def go_to_page(page_name):
+    if page_name == "Home":
+        flush_storage()  # 학습을 마치고 홈으로 돌아오면 쓰기 대기열을 바로 반영
+    if st.session_state.page == "S_Learn":
+        release_review_questions()  # 미리 꺼내 둔 복습 단어를 복습 큐로 되돌림
     st.session_state.page = page_name
 
+def switch_user(user_id): # 사용자 변경 (세션에 불러온 다른 사용자의 기록은 버림)
+    flush_storage()
+    st.session_state.user_id = user_id
+    reset_session_indexes()
+    reset_question_buffers()
+    st.session_state.pop("progress_stats", None)
+    st.session_state.pop("answer_history", None)
+    st.session_state.pop("checklist_selected", None)
+    if user_id:
+        st.query_params["user"] = user_id
+    else:
+        st.query_params.pop("user", None)
+
+def switch_deck(source): # 단어장 변경 (단어 id가 달라지므로 id로 만든 세션 상태는 버림)
+    st.session_state.file_url = source
+    st.session_state.current_index = 0
+    st.session_state.options = None
+    st.session_state.show_next_button = False
+    release_review_questions()
+    reset_question_buffers()
+    st.session_state.pop("marked_index", None)  # 오답/마크 기록은 그대로 두고 단어장 id 인덱스만 다시 만듦
+
+def study_words(word_ids): # 검색에서 고른 단어로 바로 학습모드 시작
+    vocabulary = get_session_vocabulary()
+    st.session_state.selected_ids = np.asarray(word_ids, dtype=np.int32)
+    st.session_state.selected_days = (list(dict.fromkeys(vocabulary.days[word_id] for word_id in word_ids))
+                                      if vocabulary.days is not None else [])  # 보기는 고른 단어의 Day에서 뽑음
+    st.session_state.current_index = 0
+    st.session_state.options = None
+    st.session_state.show_next_button = False
+    go_to_page("Learn")
+
+def mark_words(word_ids): # 검색에서 고른 단어를 한 번에 마크 (저장소에는 한 번만 기록)
+    vocabulary = get_session_vocabulary()
+    sync_session_indexes()  # 다른 기기에서 바뀐 마크를 먼저 반영
+    added = add_marked_words_to_drive([vocabulary.row(word_id) for word_id in word_ids], get_marked_index())
+    st.toast(f"{len(added)}개 단어를 마크했습니다." if added else "이미 모두 마크된 단어입니다.")
+
+def show_word_search(vocabulary): # 영어 단어/뜻 검색 (단어장을 불러올 때 만든 검색 인덱스 사용)
+    query = st.text_input("단어 검색 (영어 단어 또는 뜻):", key="search_query")
+    if not query.strip():
+        return
+    word_ids = get_search_index(get_session_deck_id()).search(query).tolist()
+    if not word_ids:
+        st.write("검색 결과가 없습니다.")
+        return
+    chosen = st.multiselect("검색 결과:", word_ids, default=word_ids,
+                            format_func=lambda word_id: f"{vocabulary.words[word_id]} - {vocabulary.meanings[word_id]}")
+    col1, col2 = st.columns(2)
+    col1.button("선택한 단어 학습", on_click=study_words, args=(chosen,), disabled=not chosen)
+    col2.button("선택한 단어 마크", on_click=mark_words, args=(chosen,), disabled=not chosen)
+
 def load_google_credentials(secret_name): # 구글 드라이브 API 인증
     credentials_json = get_credentials_from_secret_manager()  
     # st.write("Google Credentials Loaded Successfully")
@@ -91,46 +181,82 @@ def main(): # 구글 인증 정보 로드
 
 # 페이지별 내용
 # 홈 페이지
-def home_page(data):
+def home_page():
     st.title("단어 암기 프로그램")
-    
+
+    # 단어장 선택 (여러 단어장을 등록한 경우)
+    if len(deck_sources) > 1:
+        source = st.selectbox("단어장을 선택하세요:", deck_sources, format_func=deck_label,
+                              index=deck_sources.index(st.session_state.file_url))
+        if source != st.session_state.file_url:
+            switch_deck(source)
+            st.rerun()
+
+    # 제목을 먼저 그린 뒤 단어장 불러오기 (새 워커에서 처음 한 번만 내려받아 변환)
+    with st.spinner("단어장을 불러오는 중..."):
+        vocabulary = get_session_vocabulary()
+    data = vocabulary.data
+
     # 데이터가 비어 있는지 확인
     if data.empty:
         st.error("데이터가 없습니다. 데이터를 확인하세요.")
         return
 
-    # 분류 선택
-    if "Day" in data.columns:
-        categories = st.multiselect("분류를 선택하세요 (Day):", data["Day"].unique())
-        filtered_data = data[data["Day"].isin(categories)] if categories else data
+    # 사용자 선택 (사용자마다 학습 기록을 따로 저장)
+    user_id = st.text_input("사용자 ID (비워 두면 공용 기록 사용):", value=get_user_id()).strip()
+    if user_id != get_user_id():
+        switch_user(user_id)
+
+    # 단어 검색 (고른 단어로 바로 학습하거나 마크)
+    show_word_search(vocabulary)
+
+    # 분류 선택 (단어장을 불러올 때 만든 Day 인덱스 사용, 데이터프레임을 다시 훑지 않음)
+    if vocabulary.days is not None:
+        categories = st.multiselect("분류를 선택하세요 (Day):", vocabulary.day_names)
     else:
         st.warning("'Day' 열이 없어 전체 데이터를 사용합니다.")
-        filtered_data = data
-
-    if filtered_data.empty:
+        categories = []
+    selected_ids = vocabulary.select(categories)
+
+    # 보기 방식 선택 (무작위 / 철자·뜻이 비슷한 헷갈리는 보기)
+    modes = list(DISTRACTOR_MODES)
+    mode = st.radio("보기 방식:", modes, format_func=DISTRACTOR_MODES.get,
+                    index=modes.index(get_distractor_mode()), horizontal=True)
+    if mode != get_distractor_mode():
+        st.session_state.distractor_mode = mode
+        reset_question_buffers()  # 이전 방식으로 미리 만든 문제는 버림
+
+    if len(selected_ids) == 0:
         st.warning("선택된 분류에 해당하는 데이터가 없습니다.")
         return
 
-    st.session_state.filtered_data = filtered_data
+    # 데이터프레임을 복사하지 않고 단어 id(Day 인덱스의 읽기 전용 view)만 세션에 저장
+    st.session_state.selected_ids = selected_ids
+    st.session_state.selected_days = categories  # 보기 선택지를 뽑을 Day 범위
     st.button("학습모드", on_click=lambda: go_to_page("Learn"))
     st.button("복습모드", on_click=lambda: go_to_page("S_Learn"))
     st.button("체크리스트", on_click=lambda: go_to_page("Mark"))
     st.button("진도율확인", on_click=lambda: go_to_page("Visual"))
+    st.button("성능 지표", on_click=lambda: go_to_page("Metrics"))
 
 def learn_page():
     st.title("학습모드")
-    filtered_data = st.session_state.filtered_data
-    if filtered_data.empty:
+    selected_ids = st.session_state.selected_ids
+    if len(selected_ids) == 0:
         st.error("필터링된 데이터가 없습니다.")
         return
+    if st.session_state.current_index >= len(selected_ids):
+        st.session_state.current_index = 0  # 홈에서 더 적은 Day를 고른 경우
+
+    # 다른 기기에서 바뀐 기록만 받아 반영 (백그라운드에서 다 받아 온 결과도 여기서 병합)
+    sync_session_indexes()
 
     # 현재 단어와 선택지 불러오기
-    current_index = st.session_state.current_index
-    current_word = filtered_data.iloc[current_index]
+    current_word = get_session_vocabulary().row(selected_ids[st.session_state.current_index])
 
     # 보기 초기화
     if "options" not in st.session_state or st.session_state.options is None:
-        update_word_and_options(filtered_data)  # 단어와 선택지 초기화
+        update_word_and_options(selected_ids)  # 단어와 선택지 초기화
         st.session_state.correct_answer = st.session_state.correct_answer
         st.session_state.options = st.session_state.options
 
@@ -142,19 +268,19 @@ def learn_page():
 
     # 정답 확인 버튼
     if st.button("정답 확인", key="check_answer"):
-        check_answer(selected_option, st.session_state.correct_answer, filtered_data)
+        check_answer(selected_option, st.session_state.correct_answer, selected_ids)
         process_and_save_incorrect_answers(selected_option, st.session_state.correct_answer, current_word)
         st.session_state.show_next_button = True
          
     # '다음 단어로' 버튼
     if st.session_state.get("show_next_button", False):
         if st.button("다음 단어로", key="next_word"):
-            move_to_next_word(filtered_data)  # 인덱스만 갱신
-            update_word_and_options(filtered_data)  # 단어와 보기 선택지 갱신
+            move_to_next_word(selected_ids)  # 인덱스만 갱신
+            update_word_and_options(selected_ids)  # 단어와 보기 선택지 갱신
             st.session_state.show_next_button = False  # 다음 단어 버튼 숨기기
 
     # 단어 마크
-    is_marked = current_word["Word"] in st.session_state.get("marked_words", [])
+    is_marked = current_word["Word"] in get_marked_index()
     if st.button("이 단어를 마크하기" if not is_marked else "마크 취소", key="mark_word"):
         toggle_mark_word(current_word["Word"], current_word)
 
@@ -162,112 +288,103 @@ def learn_page():
 
     # 학습 기록 업데이트
     # st.write("### 학습 기록")
-    # st.write(st.session_state.records)
+    # st.write(get_answer_history().recent())
 
     st.button("홈으로 이동", on_click=lambda: go_to_page("Home"))
 
+    # 화면을 다 그린 뒤 다음 문제들을 미리 준비 ("다음 단어로"는 버퍼에서 꺼내기만 함)
+    prefetch_learning_questions(selected_ids)
+
 def review_page():
     st.title("복습모드")
 
-    # Google Drive 서비스
-    try:
-        drive_service = initialize_drive_service()
-    except Exception as e:
-        st.error(f"Google Drive 초기화 실패: {e}")
-        return
-
-    # incorrect_df 초기화
-    if "incorrect_df" not in st.session_state:
-        st.session_state.incorrect_df = load_incorrect_words_from_drive()
-        # st.write("### Debug: incorrect_df 초기화 완료")
-        # st.write(st.session_state.incorrect_df)
+    # 오답 단어 인덱스 (다음 복습 시각 순서의 우선순위 큐), 다른 기기에서 바뀐 기록만 받아 반영
+    sync_session_indexes()
+    scheduler = get_incorrect_index()
 
     # 데이터가 비어 있는 경우
-    if st.session_state.incorrect_df.empty:
-        st.write("현재 복습할 오답 단어가 없습니다.")
+    if len(scheduler) == 0:
+        st.write("오답 기록을 불러오는 중입니다..." if is_syncing() else "현재 복습할 오답 단어가 없습니다.")
         st.button("홈으로 이동", on_click=lambda: go_to_page("Home"))
         return
 
     # 필터링된 데이터
-    if "filtered_data" not in st.session_state or st.session_state.filtered_data.empty:
+    if len(st.session_state.selected_ids) == 0:
         st.error("필터링된 데이터가 없습니다. 홈 화면으로 돌아가세요.")
         return
 
-    filtered_data = st.session_state.filtered_data
+    selected_ids = st.session_state.selected_ids
 
     # 세션 상태 초기화
-    if "current_word_index" not in st.session_state:
-        st.session_state.current_word_index = 0  
-    if "current_word" not in st.session_state:
-        st.session_state.current_word = None  
-    if "correct_answer" not in st.session_state:
-        st.session_state.correct_answer = None  
-    if "options" not in st.session_state:
-        st.session_state.options = []  
-    if "show_next_button" not in st.session_state:
-        st.session_state.show_next_button = False  
-
-    # 현재 복습 단어 가져오기
-    if st.session_state.current_word is None:
-        st.session_state.current_word, st.session_state.correct_answer = get_current_word(
-            st.session_state.incorrect_df, st.session_state.current_word_index
-        )
-        st.session_state.options = get_options(filtered_data, st.session_state.correct_answer)
+    if "review_word" not in st.session_state:
+        st.session_state.review_word = None
+    if "review_answer" not in st.session_state:
+        st.session_state.review_answer = None
+    if "review_options" not in st.session_state:
+        st.session_state.review_options = []
+    if "review_graded" not in st.session_state:
+        st.session_state.review_graded = False
+
+    # 복습 시각이 된 단어 가져오기
+    if st.session_state.review_word is None:
+        st.session_state.review_word, st.session_state.review_answer, st.session_state.review_options = get_current_word(scheduler)
+        st.session_state.review_graded = False
+
+    if st.session_state.review_word is None:
+        st.write("지금 복습할 단어가 없습니다.")
+        next_due = scheduler.next_due_time()
+        if next_due is not None:
+            st.write(f"다음 복습 예정: {datetime.fromtimestamp(next_due).strftime('%Y-%m-%d %H:%M')}")
+        st.button("홈으로 이동", on_click=lambda: go_to_page("Home"))
+        return
+
+    current_word = st.session_state.review_word
 
     # 현재 단어와 보기 출력
-    st.write(f"단어: **{st.session_state.current_word['Word']}**")
-    selected_option = st.radio("뜻을 선택하세요:", st.session_state.options, key="options_radio")
+    st.write(f"단어: **{current_word['Word']}**")
+    selected_option = st.radio("뜻을 선택하세요:", st.session_state.review_options, key="review_options_radio")
 
     # 정답 확인 버튼
-    if st.button("정답 확인"):
-        if selected_option == st.session_state.correct_answer:
+    if st.button("정답 확인") and not st.session_state.review_graded:
+        is_correct = selected_option == st.session_state.review_answer
+        if is_correct:
             st.success("정답입니다!")
-            # 삭제된 데이터 반영
-            st.session_state.incorrect_df = st.session_state.incorrect_df[
-                st.session_state.incorrect_df["Word"] != st.session_state.current_word["Word"]
-            ]
-            # st.write("### Debug: 정답 확인 후 incorrect_df 상태")
-            # st.write(st.session_state.incorrect_df)
         else:
-            st.error(f"오답입니다! 정답은: {st.session_state.correct_answer}")
+            st.error(f"오답입니다! 정답은: {st.session_state.review_answer}")
+        # 정답이면 복습 간격이 늘어나고, 충분히 외운 단어는 오답 목록에서 제외 (복습 일정은 기록과 함께 갱신됨)
+        save_review_answer(current_word, is_correct)
+        if current_word["Word"] not in scheduler:
+            st.info("충분히 외운 단어라 오답 목록에서 제외되었습니다.")
+        st.session_state.review_graded = True
 
     # 다음 단어로 버튼
     if st.button("다음 단어로"):
-        if not st.session_state.incorrect_df.empty:
-            st.session_state.current_word_index += 1
-            if st.session_state.current_word_index >= len(st.session_state.incorrect_df):
-                st.session_state.current_word_index = 0
-                st.warning("모든 단어를 학습했습니다. 다시 처음부터 시작합니다.")
-
-            st.session_state.current_word, st.session_state.correct_answer = get_current_word(
-                st.session_state.incorrect_df, st.session_state.current_word_index
-            )
-            st.session_state.options = get_options(filtered_data, st.session_state.correct_answer)
-            # st.write("### Debug: 다음 단어로 버튼 클릭 후 상태")
-            # st.write({"current_word": st.session_state.current_word, "correct_answer": st.session_state.correct_answer})
-            # st.write(st.session_state.options)
-        else:
-            st.write("마지막 단어입니다.")
+        if not st.session_state.review_graded:
+            scheduler.release(current_word["Word"])  # 채점하지 않은 단어는 원래 순서로 되돌림
+        st.session_state.review_word = None
+        st.rerun()
 
     # 디버깅
     # st.write("### Debug: 현재 저장된 오답 데이터프레임")
-    # st.write(st.session_state.incorrect_df)
+    # st.write(st.session_state.review_scheduler)
 
     st.button("홈 페이지로 이동", on_click=lambda: go_to_page("Home"))
 
+    # 화면을 다 그린 뒤 다음 복습 문제들을 미리 준비
+    prefetch_review_questions(scheduler)
+
 
         
 def review_checklist_page():
     st.title("체크리스트")
 
-    # 마크된 단어 불러오기
-    if "marked_words_df" not in st.session_state:
-        st.session_state.marked_words_df = load_marked_words_from_drive()
-    
-    marked_df = st.session_state.marked_words_df
+    # 마크된 단어 불러오기 (다른 기기에서 바뀐 기록만 받아 반영)
+    sync_session_indexes()
+    marked_index = get_marked_index()
+    marked_df = marked_index.to_dataframe()
 
     if marked_df.empty:
-        st.write("마크된 단어가 없습니다.")
+        st.write("마크된 단어를 불러오는 중입니다..." if is_syncing() else "마크된 단어가 없습니다.")
         st.button("홈 페이지로 이동", on_click=lambda: go_to_page("Home"))
         return
 
@@ -282,20 +399,29 @@ def review_checklist_page():
         st.write(f"{selected_day}에 해당하는 마크된 단어가 없습니다.")
         return
 
-    # 체크리스트 생성
-    checked_words = []  # 선택된 단어 저장
-    for idx, row in filtered_data.iterrows():
+    # 체크리스트 생성 (현재 페이지의 단어만 그림)
+    page_size = get_checklist_page_size()
+    pages = (len(filtered_data) + page_size - 1) // page_size
+    page = st.number_input(f"페이지 (전체 {pages})", min_value=1, max_value=pages, value=1, step=1) if pages > 1 else 1
+    checked_words = get_selected_words()  # 선택된 단어 저장 (페이지를 넘겨도 유지)
+    for row in get_page(filtered_data, page, page_size).to_dict("records"):
         col1, col2, col3 = st.columns([1, 4, 1])
         with col1:
-            checked = st.checkbox("", key=f"check_{idx}")
-            if checked:
-                checked_words.append(row["Word"])
+            st.checkbox(row["Word"], value=row["Word"] in checked_words, key=f"check_{row['Word']}",
+                        on_change=toggle_selected_word, args=(row["Word"],), label_visibility="collapsed")
         with col2:
             st.write(f"{row['Word']} - {row['Meaning']}")
         with col3:
-            if st.button("삭제", key=f"delete_{idx}"):
-                st.session_state.marked_words_df = delete_marked_word_from_drive(row["Word"], marked_df)
-                st.experimental_set_query_params() 
+            if st.button("삭제", key=f"delete_{row['Word']}"):
+                delete_marked_word_from_drive(row["Word"], marked_index)
+                checked_words.discard(row["Word"])
+                st.rerun()
+
+    # 선택한 단어를 한 번에 삭제 (저장소에는 한 번만 기록)
+    if st.button(f"선택한 단어 삭제 ({len(checked_words)}개)", key="delete_selected", disabled=not checked_words):
+        delete_marked_words_from_drive(checked_words, marked_index)
+        checked_words.clear()
+        st.rerun()
 
     # 디버깅
     # st.write("### Debug: 선택된 단어")
@@ -306,25 +432,59 @@ def review_checklist_page():
     
 def visual_page():
     st.title("진도별 상황")
-    
-    if "records" not in st.session_state:
-        st.session_state.records = []
     st.title("진도별 상황 대시보드")
 
     # 진도별 상황 요약 및 시각화 함수
     show_progress_summary()
+    show_answer_history()
+
+def metrics_page(): # 재실행/저장소 호출 시간과 횟수 확인 (관리자용)
+    st.title("성능 지표")
+
+    st.subheader("현재 세션")
+    session_rows = get_session_metrics().summary()
+    if session_rows:
+        st.dataframe(pd.DataFrame(session_rows), hide_index=True)
+    else:
+        st.write("기록된 지표가 없습니다.")
+
+    st.subheader("프로세스 전체")
+    process_rows = PROCESS_METRICS.summary()
+    if process_rows:
+        st.dataframe(pd.DataFrame(process_rows), hide_index=True)
+    else:
+        st.write("기록된 지표가 없습니다.")
+
+    # 내보내기
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button("Prometheus 텍스트", to_prometheus(PROCESS_METRICS), file_name="metrics.prom")
+    with col2:
+        st.download_button("JSON", to_json(PROCESS_METRICS), file_name="metrics.json")
+    with col3:
+        if st.button("파일로 내보내기"):
+            st.success(f"'{export_metrics()}'에 저장했습니다.")
+
+    st.button("홈 페이지로 이동", on_click=lambda: go_to_page("Home"))
+
 
 
 
+# 현재 페이지에 따라 다른 화면 표시 (페이지별 재실행 시간 기록)
+with trace(f"rerun.{st.session_state.page}"):
+    if st.session_state.page == "Home":
+        home_page()
+    elif st.session_state.page == "Learn":
+        learn_page()
+    elif st.session_state.page == "S_Learn":
+        review_page()
+    elif st.session_state.page == "Mark":
+        review_checklist_page()
+    elif st.session_state.page == "Visual":
+        visual_page()
+    elif st.session_state.page == "Metrics":
+        metrics_page()
 
-# 현재 페이지에 따라 다른 화면 표시
-if st.session_state.page == "Home":
-    home_page(data)
-elif st.session_state.page == "Learn":
-    learn_page()
-elif st.session_state.page == "S_Learn":
-    review_page()
-elif st.session_state.page == "Mark":
-    review_checklist_page()
-elif st.session_state.page == "Visual": 
-    visual_page()
\ No newline at end of file
+# 저장소 동기화 상태 (불러오기/저장이 끝나지 않았으면 진행 중으로 표시)
+with st.sidebar:
+    show_sync_status()
\ No newline at end of file
@@ -0,0 +1,135 @@
+import argparse
+import ast
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# 새 워커가 홈 화면을 그리기까지의 시작 비용을 측정하는 벤치마크
+# app.py가 불러오는 utils 모듈을 새 인터프리터에서 `python -X importtime`으로 import 하여
+# 전체/패키지별 import 시간과 무거운 의존성이 미리 불러와지는지 보고하고,
+# 별도 프로세스에서 AppTest로 홈 화면의 첫 렌더 시간을 잰다 (로컬 단어장/로컬 저장소 사용, 네트워크 없음).
+#   python benchmarks/import_time.py --runs 5
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+DEFAULT_SOURCE = os.path.join(ROOT, "토익 단어 전면개정판.xlsx")
+DEFAULT_RUNS = 5
+DEFAULT_TOP = 15
+# 홈 화면을 그리는 데 필요 없는 의존성 (불러와졌으면 경고)
+HEAVY_PACKAGES = ("googleapiclient", "google.oauth2", "google_auth_httplib2", "httplib2", "matplotlib", "openpyxl")
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def app_modules(path=APP_PATH): # app.py가 맨 위에서 불러오는 utils 모듈 목록
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = [node.module for node in tree.body
+               if isinstance(node, ast.ImportFrom) and node.module and node.module.startswith("utils.")]
+    return list(dict.fromkeys(modules))
+
+def measure_imports(modules): # 새 인터프리터에서 모듈을 import 하고 {모듈: (self us, cumulative us, 깊이)} 반환
+    code = "; ".join(f"import {module}" for module in modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr[-2000:])
+    timings = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings[name] = (int(self_us), int(cumulative_us), (len(indent) - 1) // 2)
+    return timings
+
+HOME_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "errors": [str(e.value) for e in at.exception]}))
+"""
+
+def measure_home(source): # 새 프로세스에서 홈 화면 첫 렌더 시간(초) 측정 (단어장 캐시는 비어 있는 상태)
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, VOCAB_SOURCE=source, VOCAB_CACHE_DIR=os.path.join(tmp, "vocab"),
+                   STORAGE_BACKEND="local", LOCAL_STORAGE_PATH=os.path.join(tmp, "storage.db"))
+        env.pop("VOCAB_SOURCES", None)
+        proc = subprocess.run([sys.executable, "-c", HOME_SCRIPT, APP_PATH],
+                              cwd=ROOT, capture_output=True, text=True, env=env)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr[-2000:])
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if result["errors"]:
+        raise RuntimeError("; ".join(result["errors"]))
+    return result["seconds"]
+
+
+def run(args):
+    modules = app_modules()
+    runs = [measure_imports(modules) for _ in range(args.runs)]
+
+    totals = [sum(cumulative for _, cumulative, depth in timings.values() if depth == 0) for timings in runs]
+    packages = {}  # 최상위 패키지별 self 시간 합 (실행마다)
+    for timings in runs:
+        totals_by_package = {}
+        for name, (self_us, _, _) in timings.items():
+            package = name.split(".")[0]
+            totals_by_package[package] = totals_by_package.get(package, 0) + self_us
+        for package, us in totals_by_package.items():
+            packages.setdefault(package, []).append(us)
+    by_package = {package: statistics.median(samples) for package, samples in packages.items()}
+    heavy = sorted(name for name in runs[-1]
+                   if any(name == package or name.startswith(package + ".") for package in HEAVY_PACKAGES))
+
+    result = {
+        "modules": modules,
+        "runs": args.runs,
+        "import_ms": {"median": statistics.median(totals) / 1000, "min": min(totals) / 1000, "max": max(totals) / 1000},
+        "package_ms": {package: us / 1000 for package, us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]},
+        "heavy_imports": heavy,
+    }
+    if not args.no_home:
+        home = [measure_home(args.source) for _ in range(args.runs)]
+        result["home_render_ms"] = {"median": statistics.median(home) * 1000, "min": min(home) * 1000,
+                                    "max": max(home) * 1000}
+    return result
+
+def print_report(result):
+    imports = result["import_ms"]
+    print(f"utils 모듈 {len(result['modules'])}개 import ({result['runs']}회): "
+          f"중앙값 {imports['median']:.1f}ms (최소 {imports['min']:.1f}ms, 최대 {imports['max']:.1f}ms)")
+    for package, ms in result["package_ms"].items():
+        print(f"  {ms:8.1f}ms  {package}")
+    if result["heavy_imports"]:
+        packages = sorted({name.split(".")[0] for name in result["heavy_imports"]})
+        print(f"  경고: 시작할 때 필요 없는 패키지를 불러옵니다: {', '.join(packages)}")
+    else:
+        print("  시작할 때 구글 API/matplotlib/openpyxl을 불러오지 않습니다.")
+    if "home_render_ms" in result:
+        home = result["home_render_ms"]
+        print(f"홈 화면 첫 렌더: 중앙값 {home['median']:.1f}ms (최소 {home['min']:.1f}ms, 최대 {home['max']:.1f}ms)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="앱 시작(import/홈 화면 첫 렌더) 시간 벤치마크")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="측정 횟수 (중앙값 보고)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="보고할 패키지 수 (self 시간 합 기준)")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="홈 화면 측정에 쓸 단어장 xlsx 경로")
+    parser.add_argument("--no-home", action="store_true", help="홈 화면 첫 렌더 측정 생략")
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 파일")
+    args = parser.parse_args(argv)
+
+    result = run(args)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,456 @@
+import argparse
+import ast
+import importlib.util
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# 가짜 드라이브 위에서 여러 학습자가 동시에 페이지를 클릭하는 상황을 AppTest로 재현하는 부하 테스트
+# 네트워크 없이 실행되며, 재실행(rerun) 지연 시간 p50/p95/p99, 답안 하나당 드라이브 API 호출 수,
+# 세션 하나가 차지하는 메모리를 보고하고, 끝난 뒤 사용자 영역마다 로그를 압축해 기록이 그대로인지 확인한다.
+# 마지막으로 복습 상태 열이 없는 예전 오답 스냅샷을 가진 사용자로 복습과 동기화가 되는지도 확인한다.
+#   python benchmarks/load_test.py --users 8 --answers 20
+# app.py가 불러오는 utils 모듈이 모두 있어야 실행되므로, 진행 대시보드(utils/visual_utils.py)가 추가되기 전의
+# 트리에서는 측정하지 않고 빠진 모듈을 알려 준다 (기준 측정값은 대시보드가 추가된 커밋부터 비교할 수 있다).
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APP_PATH = os.path.join(ROOT, "app.py")
+DEFAULT_SOURCE = os.path.join(ROOT, "토익 단어 전면개정판.xlsx")
+DEFAULT_USERS = 8
+DEFAULT_ANSWERS = 20
+DEFAULT_REVIEWS = 10
+DEFAULT_DRIVE_LATENCY = 0.05  # 가짜 드라이브 API 호출 한 번의 지연(초)
+DEFAULT_TIMEOUT = 120
+
+# AppTest는 재실행이 끝날 때마다 전역 Runtime을 지우므로 재실행끼리는 겹치지 않게 한다.
+# 학습자들은 재실행 단위로 번갈아 진행되고, 쓰기 대기열과 저장소 호출은 그와 동시에 백그라운드에서 진행된다.
+_RUN_LOCK = threading.Lock()
+
+
+def _configure_environment(args): # 앱이 불러오기 전에 환경 변수 설정
+    os.environ["VOCAB_SOURCE"] = args.source
+    if args.cache_dir:
+        os.environ["VOCAB_CACHE_DIR"] = args.cache_dir
+    os.environ["WRITE_BEHIND"] = "0" if args.no_write_behind else "1"
+    os.environ["WRITE_FLUSH_INTERVAL"] = str(args.flush_interval)
+
+
+_QUOTED = r"'((?:[^'\\]|\\.)*)'"  # 드라이브 검색어의 따옴표 문자열 (drive_query_value로 이스케이프됨)
+
+
+def _unquote(value):
+    return re.sub(r"\\(.)", r"\1", value)
+
+
+class FakeDriveService: # 메모리에 저장하고 호출마다 지연을 흉내 내는 드라이브 v3 files() 서비스 (호출 수를 셈)
+    # 실제 DriveStorage 아래에서 동작하므로 파일/폴더 검색, fileId 캐시, 로그 조각 이름과 삭제, 잠금 파일까지 함께 실행된다.
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = {}
+        self._lock = threading.Lock()
+        self._files = {}  # fileId -> 메타데이터와 내용
+        self._ids = itertools.count(1)
+        self._clock = 0.0  # 서버 시각 (생성/수정 시각이 같지 않도록 항상 증가)
+
+    def files(self):
+        return self
+
+    def _request(self, op, func):
+        service = self
+
+        class Request:
+            def execute(self):
+                with service._lock:
+                    service.calls[op] = service.calls.get(op, 0) + 1
+                if service.latency:
+                    time.sleep(service.latency)
+                with service._lock:
+                    return func()
+        return Request()
+
+    def _now(self): # RFC 3339 서버 시각
+        self._clock = max(time.time(), self._clock + 1e-6)
+        return datetime.fromtimestamp(self._clock, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    def _get_file(self, file_id):
+        if file_id not in self._files:
+            from googleapiclient.errors import HttpError
+            import httplib2
+
+            raise HttpError(httplib2.Response({"status": 404}), b"File not found")
+        return self._files[file_id]
+
+    @staticmethod
+    def _media_bytes(media_body):
+        return media_body.getbytes(0, media_body.size())
+
+    def _matches(self, f, q):
+        match = re.search(rf"name = {_QUOTED}", q)
+        if match and f["name"] != _unquote(match.group(1)):
+            return False
+        match = re.search(rf"{_QUOTED} in parents", q)
+        if match and _unquote(match.group(1)) not in f.get("parents", []):
+            return False
+        match = re.search(rf"key='(\w+)' and value={_QUOTED}", q)
+        if match and f.get("appProperties", {}).get(match.group(1)) != _unquote(match.group(2)):
+            return False
+        match = re.search(rf"mimeType = {_QUOTED}", q)
+        return not match or f.get("mimeType") == _unquote(match.group(1))
+
+    def list(self, q, fields=None, orderBy=None, pageSize=100, pageToken=None):
+        def run():
+            found = [{"id": file_id, **f} for file_id, f in self._files.items() if self._matches(f, q)]
+            keys = (orderBy or "name").split(",")
+            found.sort(key=lambda f: tuple(f[key.strip()] for key in keys))
+            start = int(pageToken or 0)
+            page = found[start:start + pageSize]
+            result = {"files": [{key: f[key] for key in ("id", "name", "createdTime")} for f in page]}
+            if start + pageSize < len(found):
+                result["nextPageToken"] = str(start + pageSize)
+            return result
+        return self._request("list", run)
+
+    def create(self, body, media_body=None, fields=None):
+        def run():
+            file_id = f"f{next(self._ids)}"
+            now = self._now()
+            self._files[file_id] = dict(body, data=self._media_bytes(media_body) if media_body else None,
+                                        version=1, createdTime=now, modifiedTime=now)
+            return {"id": file_id}
+        return self._request("create", run)
+
+    def update(self, fileId, media_body=None, fields=None):
+        def run():
+            f = self._get_file(fileId)
+            f.update(data=self._media_bytes(media_body), version=f["version"] + 1, modifiedTime=self._now())
+            return {"id": fileId}
+        return self._request("update", run)
+
+    def get(self, fileId, fields=None):
+        def run():
+            f = self._get_file(fileId)
+            return {"id": fileId, "version": str(f["version"]), "modifiedTime": f["modifiedTime"]}
+        return self._request("get", run)
+
+    def get_media(self, fileId):
+        return self._request("get_media", lambda: self._get_file(fileId)["data"])
+
+    def delete(self, fileId):
+        def run():
+            self._get_file(fileId)
+            del self._files[fileId]
+        return self._request("delete", run)
+
+
+def install_fake_drive(latency): # 저장소를 가짜 드라이브 서비스 위의 실제 DriveStorage로 교체
+    import utils.storage_utils as storage_utils
+
+    service = FakeDriveService(latency)
+    storage_utils.create_storage = lambda backend=None: storage_utils.DriveStorage(
+        service, compress=os.getenv("STORAGE_GZIP", "0") == "1")
+    return service
+
+
+def deep_sizeof(obj, seen): # 객체가 참조하는 전체 메모리 (seen에 있는 공유 객체는 제외)
+    if id(obj) in seen or isinstance(obj, (type, types.ModuleType, types.FunctionType)):
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) + (obj.nbytes if obj.base is None else 0)
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(np.sum(obj.memory_usage(deep=True)))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif isinstance(obj, (bytearray, bytes, str, int, float, bool)) or obj is None:
+        return size
+    else:
+        if hasattr(obj, "__dict__"):
+            size += deep_sizeof(vars(obj), seen)
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+class Learner: # AppTest 하나로 학습자 한 명의 클릭 흐름을 실행하고 재실행 시간을 기록
+    def __init__(self, seed, timeout, user_id=None):
+        from streamlit.testing.v1 import AppTest
+
+        self.app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        if user_id:
+            self.app.query_params["user"] = user_id  # 학습자마다 따로 저장 (?user=)
+        self.rng = random.Random(seed)
+        self.latencies = []
+        self.answers = 0
+        self.errors = []
+
+    def _run(self, element=None): # 위젯 조작 후 재실행 (걸린 시간 기록)
+        with _RUN_LOCK:
+            start = time.perf_counter()
+            (element or self.app).run()
+            self.latencies.append(time.perf_counter() - start)
+        if self.app.exception:
+            self.errors.extend(e.value for e in self.app.exception)
+
+    def _button(self, label=None, key=None):
+        for button in self.app.button:
+            if (key is not None and button.key == key) or (label is not None and button.label == label):
+                return button
+        return None
+
+    def _click(self, label=None, key=None):
+        button = self._button(label, key)
+        if button is None:
+            return False
+        self._run(button.click())
+        return True
+
+    def _answer(self, radio): # 보기 중 하나를 골라 둠
+        if radio.options:
+            radio.set_value(self.rng.choice(radio.options))
+
+    def home(self, n_days):
+        self._run()
+        if self.app.multiselect:
+            days = list(self.app.multiselect[0].options)
+            self._run(self.app.multiselect[0].set_value(self.rng.sample(days, min(n_days, len(days)))))
+
+    def learn(self, n_answers, mark_ratio):
+        self._click("학습모드")
+        for _ in range(n_answers):
+            if not self.app.radio:
+                break
+            self._answer(self.app.radio[0])
+            self._click(key="check_answer")
+            self.answers += 1
+            if self.rng.random() < mark_ratio:
+                self._click(key="mark_word")
+            self._click(key="next_word")
+        self._click("홈으로 이동")
+
+    def review(self, n_reviews):
+        self._click("복습모드")
+        for _ in range(n_reviews):
+            if not self.app.radio:
+                break
+            self._answer(self.app.radio[0])
+            self._click("정답 확인")
+            self.answers += 1
+            self._click("다음 단어로")
+        self._click("홈 페이지로 이동") or self._click("홈으로 이동")
+
+    def checklist(self):
+        self._click("체크리스트")
+        self._click("삭제")  # 마크된 단어가 있으면 하나 삭제
+        self._click("홈 페이지로 이동")
+
+    def session_state(self):
+        return self.app.session_state.to_dict()
+
+
+def run_learner(index, args): # 학습자 한 명의 전체 흐름
+    learner = Learner(args.seed + index, args.timeout, None if args.shared_user else f"learner-{index}")
+    learner.home(args.days)
+    learner.learn(args.answers, args.mark_ratio)
+    learner.review(args.reviews)
+    learner.checklist()
+    return learner
+
+
+def check_compaction(namespaces): # 학습이 끝난 뒤 사용자 영역마다 로그를 압축해 보고, 압축 전후 기록이 같은지 확인
+    from utils.event_log_utils import (compact_event_log,
+                                       live_rows,
+                                       replay_progress)
+    from utils.storage_utils import (NamespacedStorage,
+                                     get_storage)
+
+    backend = getattr(get_storage(), "backend", get_storage())  # 쓰기 대기열은 이미 비웠으므로 드라이브에 바로 접근
+    errors = []
+    for namespace in namespaces:
+        storage = NamespacedStorage(backend, namespace)
+        before = [live_rows(rows) for rows in replay_progress(storage)[:2]]
+        compact_event_log(storage)
+        after = [live_rows(rows) for rows in replay_progress(storage)[:2]]
+        if before != after:
+            errors.append(f"{namespace or '(공용)'}: 압축 후 학습 기록이 달라졌습니다.")
+    return errors
+
+def check_legacy_snapshot(args): # 복습 상태 열이 없는 예전 오답 스냅샷(Day, Word, Meaning, Date)으로 복습과 동기화가 되는지 확인
+    from utils.common_utils import get_vocabulary
+    from utils.event_log_utils import INCORRECT_FILE
+    from utils.srs_utils import CARD_COLUMNS
+    from utils.storage_utils import (NamespacedStorage,
+                                     flush_storage,
+                                     get_storage,
+                                     user_namespace)
+
+    user = "legacy-learner"
+    storage = NamespacedStorage(get_storage(), user_namespace(user))
+    legacy = get_vocabulary(args.source).data[["Day", "Word", "Meaning"]].head(4).assign(Date="2024-01-01 00:00:00")
+    storage.save_df(legacy.head(2), INCORRECT_FILE)
+    flush_storage(timeout=args.timeout)
+
+    learner = Learner(args.seed, args.timeout, user)
+    learner.home(args.days)
+    learner.review(1)  # 스냅샷으로 복습 일정을 만듦
+    storage.save_df(legacy, INCORRECT_FILE)  # 다른 기기의 예전 앱이 오답을 더 저장한 경우
+    flush_storage(timeout=args.timeout)
+    learner.app.session_state["last_sync"] = 0  # 다음 재실행에서 바로 동기화
+    learner.review(1)  # 동기화로 받은 행이 복습 일정에 추가됨 (apply_changes)
+
+    errors = [f"{user}: {error}" for error in learner.errors]
+    scheduler = learner.app.session_state["review_scheduler"]
+    if not errors and not all(word in scheduler for word in legacy["Word"]):
+        errors.append(f"{user}: 예전 스냅샷의 오답이 복습 일정에 모두 들어가지 않았습니다.")
+    rows = list(iter(lambda: scheduler.pop_due(float("inf")), None))
+    for row in rows:
+        scheduler.release(row["Word"])
+    if any(not isinstance(row.get(column), (int, float)) or pd.isna(row[column])
+           for row in rows for column in CARD_COLUMNS):
+        errors.append(f"{user}: 복습 일정에 복습 상태가 비어 있는 행이 있습니다.")
+    return errors
+
+def shared_objects(source): # 모든 세션이 공유하는 객체 (세션 메모리에서 제외)
+    from utils.common_utils import (get_vocabulary,
+                                    resolve_deck)
+    from utils.quiz_utils import get_meaning_index
+    from utils.storage_utils import get_storage
+
+    vocabulary = get_vocabulary(source)
+    return {id(vocabulary), id(vocabulary.data), id(get_meaning_index(resolve_deck(source))), id(get_storage())}
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else float("nan")
+
+
+def run(args):
+    _configure_environment(args)
+    drive = install_fake_drive(args.drive_latency)
+
+    # 단어장 변환과 캐시 생성은 첫 실행에서 한 번만 일어나므로 따로 측정
+    start = time.perf_counter()
+    warm_up = Learner(args.seed - 1, args.timeout)
+    warm_up.home(args.days)
+    cold_start = time.perf_counter() - start
+    calls_before = dict(drive.calls)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as executor:
+        learners = list(executor.map(lambda i: run_learner(i, args), range(args.users)))
+    elapsed = time.perf_counter() - start
+
+    from utils.metrics_utils import PROCESS_METRICS
+    from utils.storage_utils import flush_storage
+    flushed = flush_storage(timeout=args.timeout)
+    calls_by_op = {op: n - calls_before.get(op, 0) for op, n in sorted(drive.calls.items())
+                   if n > calls_before.get(op, 0)}  # 압축 확인 전까지의 호출만
+    storage_calls = sum(calls_by_op.values())
+
+    from utils.storage_utils import user_namespace
+    namespaces = {user_namespace(None if args.shared_user else f"learner-{i}") for i in range(args.users)}
+    compaction_errors = check_compaction(sorted(namespaces)) if flushed else []
+    legacy_errors = check_legacy_snapshot(args)
+
+    latencies = [value for learner in learners for value in learner.latencies]
+    answers = sum(learner.answers for learner in learners)
+
+    shared = shared_objects(args.source)
+    session_bytes = [deep_sizeof(learner.session_state(), set(shared)) for learner in learners]
+    errors = [error for learner in learners for error in learner.errors] + compaction_errors + legacy_errors
+
+    return {
+        "users": args.users,
+        "reruns": len(latencies),
+        "answers": answers,
+        "elapsed_s": round(elapsed, 3),
+        "cold_start_s": round(cold_start, 3),
+        "rerun_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies) * 1000, 2) if latencies else None,
+        },
+        "storage_calls": storage_calls,
+        "storage_calls_per_answer": round(storage_calls / answers, 3) if answers else None,
+        "storage_calls_by_op": calls_by_op,
+        "session_bytes": {
+            "mean": int(np.mean(session_bytes)) if session_bytes else 0,
+            "max": int(max(session_bytes)) if session_bytes else 0,
+        },
+        "write_queue_flushed": flushed,
+        "errors": errors[:10],
+        "trace": PROCESS_METRICS.summary(),  # 함수별 호출 시간 (utils.metrics_utils)
+    }
+
+
+def print_report(result):
+    print(f"학습자 {result['users']}명, 재실행 {result['reruns']}회, 답안 {result['answers']}개 "
+          f"({result['elapsed_s']}s, 첫 실행 {result['cold_start_s']}s)")
+    latency = result["rerun_ms"]
+    print(f"  재실행 지연(ms): p50 {latency['p50']}  p95 {latency['p95']}  "
+          f"p99 {latency['p99']}  max {latency['max']}")
+    print(f"  드라이브 API 호출: {result['storage_calls']}회, 답안당 {result['storage_calls_per_answer']}회 "
+          f"{result['storage_calls_by_op']}")
+    memory = result["session_bytes"]
+    print(f"  세션 메모리: 평균 {memory['mean'] / 1024:.1f} KiB, 최대 {memory['max'] / 1024:.1f} KiB")
+    if not result["write_queue_flushed"]:
+        print("  경고: 쓰기 대기열이 시간 안에 모두 반영되지 않았습니다.")
+    for error in result["errors"]:
+        print(f"  오류: {error}")
+
+
+def missing_app_modules(path=APP_PATH): # app.py가 맨 위에서 불러오지만 트리에 없는 utils 모듈
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = [node.module for node in tree.body
+               if isinstance(node, ast.ImportFrom) and node.module and node.module.startswith("utils.")]
+    return [module for module in dict.fromkeys(modules) if importlib.util.find_spec(module) is None]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가짜 드라이브를 사용한 오프라인 부하 테스트")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS, help="동시에 실행할 학습자 수")
+    parser.add_argument("--answers", type=int, default=DEFAULT_ANSWERS, help="학습자 한 명이 학습모드에서 푸는 문제 수")
+    parser.add_argument("--reviews", type=int, default=DEFAULT_REVIEWS, help="학습자 한 명이 복습모드에서 푸는 문제 수")
+    parser.add_argument("--days", type=int, default=2, help="홈에서 고를 Day 수")
+    parser.add_argument("--mark-ratio", type=float, default=0.2, help="문제마다 단어를 마크할 확률")
+    parser.add_argument("--drive-latency", type=float, default=DEFAULT_DRIVE_LATENCY, help="가짜 드라이브 호출 지연(초)")
+    parser.add_argument("--flush-interval", type=float, default=5.0, help="쓰기 대기열 반영 주기(초)")
+    parser.add_argument("--no-write-behind", action="store_true", help="쓰기 대기열 없이 바로 저장")
+    parser.add_argument("--shared-user", action="store_true", help="모든 학습자가 공용 기록을 사용 (사용자 ID 없음)")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="단어장 xlsx 경로 또는 URL")
+    parser.add_argument("--cache-dir", help="단어장 Arrow 파일 저장 위치")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="재실행 한 번의 제한 시간(초)")
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 파일")
+    args = parser.parse_args(argv)
+
+    missing = missing_app_modules()
+    if missing:
+        print(f"app.py가 불러오는 모듈이 없어 부하 테스트를 실행할 수 없습니다: {', '.join(missing)}", file=sys.stderr)
+        return 2
+    result = run(args)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
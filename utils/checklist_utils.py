@@ -2,9 +2,6 @@ import os
 import random
 import pandas as pd
 from datetime import datetime
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
 import streamlit as st
 
 from utils.common_utils import (initialize_session,
@@ -13,30 +10,61 @@ from utils.common_utils import (initialize_session,
                                 load_google_credentials,
                                 save_to_drive,
                                 find_file_in_drive)
+from utils.event_log_utils import (make_event,
+                                   load_progress)
+from utils.index_utils import record_events
 
+# 체크리스트는 한 페이지에 CHECKLIST_PAGE_SIZE개씩만 그리고, 선택한 단어는 페이지를 넘겨도 유지한다.
+DEFAULT_CHECKLIST_PAGE_SIZE = 20
+SELECTED_KEY = "checklist_selected"
 
-def load_marked_words_from_drive(): # 구글 드라이브에서 마크된 단어 데이터를 불러오기
-    credentials = load_google_credentials()
-    if not credentials:
-        st.warning("구글 인증 실패: 자격 증명이 없습니다.")
-        return pd.DataFrame()
-
-    drive_service = build("drive", "v3", credentials=credentials)
-    file_id = find_file_in_drive('marked_words.csv', drive_service)
-    if not file_id:
-        st.warning("구글 드라이브에서 'marked_words.csv' 파일을 찾을 수 없습니다.")
-        return pd.DataFrame()
 
+def load_marked_words_from_drive(): # 저장소의 스냅샷과 이벤트 로그로 마크된 단어 데이터를 복원
     try:
-        request = drive_service.files().get_media(fileId=file_id)
-        file_data = request.execute()
-        from io import StringIO
-        return pd.read_csv(StringIO(file_data.decode('utf-8')))
+        _, marked_df = load_progress()
     except Exception as e:
         st.error(f"마크된 단어 데이터를 불러오는 중 오류 발생: {e}")
         return pd.DataFrame()
+    return marked_df
     
-def delete_marked_word_from_drive(word, marked_df):
-    marked_df = marked_df[marked_df["Word"] != word]  # 데이터프레임에서 단어 제거
-    save_to_drive(marked_df, "marked_words.csv")  # 수정된 데이터 저장
-    return marked_df
\ No newline at end of file
+def delete_marked_word_from_drive(word, marked_index): # 마크 인덱스에서 단어 제거 (O(1)) 후 마크 취소 이벤트만 저장
+    marked_index.remove(word)
+    record_events(make_event("mark", {"Word": word}, marked=False))
+    return marked_index
+
+def delete_marked_words_from_drive(words, marked_index): # 선택한 단어를 마크 인덱스에서 한 번에 제거하고 마크 취소 이벤트를 한 번에 저장
+    removed = marked_index.remove_many(words)
+    if removed:
+        record_events(*(make_event("mark", {"Word": word}, marked=False) for word in removed))
+    return removed
+
+def add_marked_words_to_drive(rows, marked_index): # 여러 단어를 한 번에 마크 인덱스에 추가하고 마크 이벤트를 한 번에 저장 (이미 마크된 단어는 건너뜀)
+    date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    added = []
+    for row in rows:
+        if row["Word"] in marked_index:
+            continue
+        entry = {"Word": row["Word"], "Meaning": row.get("Meaning", "No meaning provided"),
+                 "Day": row.get("Day", "Unspecified"), "Date": date}
+        marked_index.add(entry)
+        added.append(entry)
+    if added:
+        record_events(*(make_event("mark", entry, marked=True) for entry in added))
+    return added
+
+def get_checklist_page_size(): # 체크리스트 한 페이지의 단어 수
+    return max(int(os.getenv("CHECKLIST_PAGE_SIZE", DEFAULT_CHECKLIST_PAGE_SIZE)), 1)
+
+def get_page(dataframe, page, page_size): # page번째(1부터) 페이지의 행
+    start = (page - 1) * page_size
+    return dataframe.iloc[start:start + page_size]
+
+def get_selected_words(): # 체크리스트에서 선택한 단어 (페이지와 Day를 바꿔도 유지)
+    return st.session_state.setdefault(SELECTED_KEY, set())
+
+def toggle_selected_word(word): # 체크박스를 누를 때 선택 목록 갱신
+    selected = get_selected_words()
+    if st.session_state[f"check_{word}"]:
+        selected.add(word)
+    else:
+        selected.discard(word)
@@ -1,29 +1,64 @@
 import os
 import random
+import threading
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
 import streamlit as st
 
+from urllib.parse import unquote
+from utils.vocab_utils import (artifact_path,
+                               compile_vocabulary,
+                               read_artifact,
+                               Vocabulary)
+from utils.metrics_utils import traced
+
 def initialize_session(): # 세션 상태 초기화
     default_states = {
         "page": "Home",
-        "marked_words": [],
-        "records": [],
         "current_index": 0,
         "known_words": [],
-        "unknown_words": [],
-        "filtered_data": pd.DataFrame(),
+        "selected_ids": np.empty(0, dtype=np.int32),
     }
     for key, value in default_states.items():
         if key not in st.session_state:
             st.session_state[key] = value
 
-@st.cache_data
-def load_data(file_url):
-    return pd.read_excel(file_url)
+# 단어장 목록: VOCAB_SOURCES(';'로 구분한 URL 또는 로컬 xlsx/CSV 경로) 또는 VOCAB_SOURCE, 없으면 기본 단어장
+DEFAULT_DECK_SOURCE = 'https://raw.githubusercontent.com/blue-915/project/a478d554ddf9ff9b522ef24432c5b8b3d2147de1/os/%EB%85%B8%EB%9E%AD%EC%9D%B4%20%EC%A0%84%EB%A9%B4%EA%B0%9C%EC%A0%95%ED%8C%90.xlsx'
+
+def get_deck_sources(): # 선택할 수 있는 단어장 위치 목록 (중복 제거, 순서 유지)
+    sources = [source.strip() for source in os.getenv("VOCAB_SOURCES", "").split(";") if source.strip()]
+    if not sources:
+        sources = [os.getenv("VOCAB_SOURCE") or DEFAULT_DECK_SOURCE]
+    return list(dict.fromkeys(sources))
+
+def deck_label(source): # 화면에 보여 줄 단어장 이름 (파일 이름)
+    name = unquote(source.rstrip("/").rsplit("/", 1)[-1])
+    return os.path.splitext(os.path.basename(name))[0] or source
+
+@st.cache_resource
+def resolve_deck(source): # 단어장 위치 -> 내용 해시 (프로세스당 한 번만 내려받아 Arrow 파일로 변환)
+    digest, _ = compile_vocabulary(source)
+    return digest
+
+@st.cache_resource
+def get_deck(deck_id): # 내용 해시 -> 공유 단어장 (위치가 달라도 내용이 같으면 한 벌만 불러옴)
+    return Vocabulary(read_artifact(artifact_path(deck_id)))
+
+def get_vocabulary(file_url): # 모든 세션이 공유하는 단어장 (세션마다 복사하지 않음)
+    return get_deck(resolve_deck(file_url))
+
+def get_session_deck_id(): # 현재 세션에서 선택한 단어장의 내용 해시
+    return resolve_deck(st.session_state.file_url)
+
+def get_session_vocabulary(): # 현재 세션에서 사용하는 단어장
+    return get_vocabulary(st.session_state.file_url)
+
+def get_user_id(): # 현재 세션의 사용자 ID (?user= 쿼리 파라미터 또는 홈 화면 입력, 비어 있으면 공용 파일 사용)
+    if "user_id" not in st.session_state:
+        st.session_state.user_id = st.query_params.get("user", "").strip()
+    return st.session_state.user_id
 
 def handle_page_navigation(page_name): # 페이지 이동 처리
     st.session_state.page = page_name
@@ -50,7 +85,7 @@ def load_google_credentials(): # 구글 서비스 계정 인증 로드
         return None
 '''   
 # 경로를 직접 설정한 경우
-os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = '/mnt/c/Users/User/Downloads/study/service_account.json'
+os.environ.setdefault("GOOGLE_APPLICATION_CREDENTIALS", '/mnt/c/Users/User/Downloads/study/service_account.json')
 
 def get_credentials_from_secret_manager(): # 구글 서비스 계정 인증을 위한 함수
     credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
@@ -64,36 +99,64 @@ def load_google_credentials(): # 구글 서비스 계정 인증 로드
     if not credentials_path:
         st.error("Google Credentials 경로가 설정되지 않았습니다.")
         return None
+    from google.oauth2.service_account import Credentials  # 구글 라이브러리는 드라이브를 처음 쓸 때 불러옴
+
     credentials = Credentials.from_service_account_file(credentials_path)
-    st.write("Google Credentials Loaded Successfully")
+    # st.write("Google Credentials Loaded Successfully")
     return credentials
 
 
-def save_to_drive(dataframe, filename): # 구글 드라이브에 데이터프레임 저장
-    filepath = f"/tmp/{filename}"
-    dataframe.to_csv(filepath, index=False)
+@traced("storage.save_df")
+def save_to_drive(dataframe, filename): # 설정된 저장소(구글 드라이브/로컬)의 현재 사용자 영역에 데이터프레임 저장
+    from utils.storage_utils import get_user_storage  # storage_utils가 이 모듈을 import 하므로 지연 import
+    try:
+        get_user_storage().save_df(dataframe, filename)
+    except Exception as e:
+        st.error(f"'{filename}' 저장 중 오류 발생: {e}")
+        return False
+    return True
+
+def drive_query_value(value): # 드라이브 검색어에 넣을 문자열 이스케이프
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+@traced("drive.find_file")
+def find_file_in_drive(filename, drive_service, parent_id=None, mime_type=None): # 구글 드라이브에서 파일 검색 (parent_id가 있으면 그 폴더 안에서만)
+    query = f"name = '{drive_query_value(filename)}' and trashed = false"
+    if parent_id:
+        query += f" and '{drive_query_value(parent_id)}' in parents"
+    if mime_type:
+        query += f" and mimeType = '{mime_type}'"
+    results = drive_service.files().list(q=query, fields="files(id, name)").execute()
+    files = results.get("files", [])
+    return files[0]["id"] if files else None
+
+@st.cache_resource
+def get_drive_service(): # 프로세스 전체에서 공유하는 구글 드라이브 클라이언트
+    import httplib2
+    import google_auth_httplib2
+    from googleapiclient.discovery import build
+    from googleapiclient.http import HttpRequest
 
     credentials = load_google_credentials()
     if not credentials:
-        return
+        raise Exception("Google Drive 인증에 실패했습니다.")
 
-    drive_service = build("drive", "v3", credentials=credentials)
-    file_id = find_file_in_drive(filename, drive_service)
-    if file_id:
-        drive_service.files().delete(fileId=file_id).execute()
+    # httplib2.Http는 스레드 안전하지 않으므로 스레드마다 연결을 하나씩 두고 재사용하며,
+    # AuthorizedHttp가 만료된 토큰을 자동으로 갱신한다.
+    connections = threading.local()
 
-    file_metadata = {"name": filename}
-    media = MediaFileUpload(filepath, mimetype="text/csv")
-    drive_service.files().create(body=file_metadata, media_body=media).execute()
+    def get_http():
+        if not hasattr(connections, "http"):
+            connections.http = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http())
+        return connections.http
 
-def find_file_in_drive(filename, drive_service): # 구글 드라이브에서 파일 검색
-    results = drive_service.files().list(q=f"name = '{filename}'", fields="files(id, name)").execute()
-    files = results.get("files", [])
-    return files[0]["id"] if files else None
+    def build_request(http, *args, **kwargs):
+        return HttpRequest(get_http(), *args, **kwargs)
+
+    authorized_http = get_http()
+    # 라이브러리에 포함된 discovery 문서를 사용하여 네트워크 요청을 생략
+    return build("drive", "v3", http=authorized_http, requestBuilder=build_request,
+                 cache_discovery=False, static_discovery=True)
 
 def initialize_drive_service():
-    credentials = load_google_credentials()
-    if credentials:
-        return build("drive", "v3", credentials=credentials)
-    else:
-        raise Exception("Google Drive 인증에 실패했습니다.")
\ No newline at end of file
+    return get_drive_service()
@@ -0,0 +1,134 @@
+import os
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+
+from utils.metrics_utils import traced
+
+# 헷갈리는 보기 인덱스: 뜻마다 (뜻 문자열, 그 뜻을 가진 영어 단어)를 문자 n-gram tf-idf 희소 벡터로 만들고,
+# 코사인 유사도가 높은 다른 뜻 상위 K개를 (뜻 수, K) int32 배열로 미리 계산해 단어장 Arrow 파일 옆에 저장한다.
+# 문제를 낼 때는 이 배열에서 한 줄을 읽기만 하므로 유사도를 다시 계산하지 않는다.
+# 뜻 코드는 pd.factorize(뜻 열)의 순서 (quiz_utils.MeaningIndex와 같음), 이웃이 없는 칸은 -1.
+NGRAM_SIZES = (2, 3)
+DEFAULT_NEIGHBORS = 16
+MAX_DOCUMENT_FREQUENCY = 0.05  # 이 비율보다 많은 뜻에 나오는 n-gram은 무시 (예: "하다", "tion")
+MAX_POSTINGS = 1000  # n-gram 하나가 가질 수 있는 최대 뜻 수 (큰 단어장에서 쌍 수 제한)
+MIN_POSTINGS = 10
+BLOCK_CELLS = 4_000_000  # 한 번에 계산할 (행 수 x 뜻 수) 유사도 칸 수
+_SEPARATORS = re.compile(r"[^\w]+")
+
+
+class CsrMatrix: # 행 압축(CSR) 희소 행렬
+    __slots__ = ("indptr", "indices", "data", "shape")
+
+    def __init__(self, indptr, indices, data, shape):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = shape
+
+    @classmethod
+    def from_coo(cls, rows, cols, values, shape): # (행, 열, 값) 목록 -> CSR (같은 칸은 더함)
+        flat = rows.astype(np.int64) * shape[1] + cols
+        flat, inverse = np.unique(flat, return_inverse=True)
+        data = np.bincount(inverse, weights=values).astype(np.float32)
+        rows, cols = np.divmod(flat, shape[1])
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=shape[0]), out=indptr[1:])
+        return cls(indptr, cols.astype(np.int32), data, shape)
+
+    def transpose(self): # 열 압축(CSC) 대신 전치 행렬을 CSR로 (열 -> 그 열을 가진 행 목록)
+        rows = np.repeat(np.arange(self.shape[0], dtype=np.int32), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind="stable")
+        indptr = np.zeros(self.shape[1] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=self.shape[1]), out=indptr[1:])
+        return CsrMatrix(indptr, rows[order], self.data[order], (self.shape[1], self.shape[0]))
+
+
+def normalize_text(text): # 비교용 문자열 (NFC, 소문자, 기호는 공백으로)
+    text = unicodedata.normalize("NFC", str(text)).lower()
+    return _SEPARATORS.sub(" ", text).strip()
+
+def char_ngrams(text, sizes=NGRAM_SIZES): # 단어마다 앞뒤에 공백을 붙여 만든 문자 n-gram 목록
+    grams = []
+    for token in normalize_text(text).split():
+        token = f" {token} "
+        for n in sizes:
+            grams.extend(token[i:i + n] for i in range(len(token) - n + 1))
+    return grams
+
+def _tfidf(documents, n_rows, max_df): # 문서(n-gram 목록) -> 행마다 L2 정규화한 (행, 열, 값), 열 수
+    lengths = np.fromiter((len(grams) for grams in documents), dtype=np.int64, count=n_rows)
+    if not lengths.sum():
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float64), 0
+    cols, uniques = pd.factorize(pd.Series([gram for grams in documents for gram in grams], dtype=object))
+    rows = np.repeat(np.arange(n_rows), lengths)
+    pairs, counts = np.unique(rows * len(uniques) + cols, return_counts=True)
+    rows, cols = np.divmod(pairs, len(uniques))
+
+    df = np.bincount(cols, minlength=len(uniques))
+    keep = df[cols] <= max_df
+    rows, cols, counts = rows[keep], cols[keep], counts[keep]
+    values = (1 + np.log(counts)) * (np.log((1 + n_rows) / (1 + df[cols])) + 1)
+    norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=n_rows))
+    return rows, cols, values / norms[rows], len(uniques)
+
+@traced("confusable.build")
+def build_neighbors(words, meanings, k=DEFAULT_NEIGHBORS): # 단어/뜻 배열 -> (고유 뜻 수, k) 이웃 뜻 코드 배열
+    codes, uniques = pd.factorize(pd.Series(meanings, dtype=object))
+    n = len(uniques)
+    words_of = [[] for _ in range(n)]
+    for word, code in zip(words, codes):
+        if code >= 0 and isinstance(word, str):
+            words_of[code].append(word)
+
+    max_df = max(MIN_POSTINGS, min(int(MAX_DOCUMENT_FREQUENCY * n), MAX_POSTINGS))
+    # 뜻 n-gram과 단어 n-gram을 따로 정규화해 이어 붙임 -> 내적 = 두 코사인 유사도의 평균
+    m_rows, m_cols, m_values, m_size = _tfidf([char_ngrams(meaning) for meaning in uniques], n, max_df)
+    w_rows, w_cols, w_values, w_size = _tfidf([char_ngrams(" ".join(ws)) for ws in words_of], n, max_df)
+    matrix = CsrMatrix.from_coo(np.concatenate([m_rows, w_rows]),
+                                np.concatenate([m_cols, w_cols + m_size]),
+                                np.concatenate([m_values, w_values]) * np.sqrt(0.5),
+                                (n, m_size + w_size))
+    postings = matrix.transpose()
+
+    k = min(k, max(n - 1, 0))
+    neighbors = np.full((n, k), -1, dtype=np.int32)
+    if not k:
+        return neighbors
+    block = max(1, BLOCK_CELLS // n)
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        lo, hi = matrix.indptr[start], matrix.indptr[stop]
+        rows = np.repeat(np.arange(stop - start), np.diff(matrix.indptr[start:stop + 1]))
+        cols, values = matrix.indices[lo:hi], matrix.data[lo:hi]
+
+        # 행의 n-gram마다 그 n-gram을 가진 뜻 목록을 펼쳐 (행, 다른 뜻) 점수를 한 번에 더함
+        begins, lengths = postings.indptr[cols], np.diff(postings.indptr)[cols]
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(begins, lengths)
+        flat = np.repeat(rows, lengths) * n + postings.indices[offsets]
+        scores = np.bincount(flat, weights=np.repeat(values, lengths) * postings.data[offsets],
+                             minlength=(stop - start) * n).reshape(stop - start, n)
+        scores[np.arange(stop - start), np.arange(start, stop)] = 0  # 자기 자신 제외
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top, top_scores = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+        neighbors[start:stop] = np.where(top_scores > 0, top, -1)
+    return neighbors
+
+def write_neighbors(neighbors, path): # 이웃 배열을 .npy로 저장 (임시 파일에 쓴 뒤 교체)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, neighbors)
+    os.replace(tmp_path, path)
+
+def read_neighbors(path, n_meanings): # 저장한 이웃 배열 (메모리 매핑), 없거나 뜻 수가 다르면 None
+    try:
+        neighbors = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    return neighbors if neighbors.ndim == 2 and len(neighbors) == n_meanings else None
@@ -0,0 +1,328 @@
+import itertools
+import json
+import math
+import threading
+import time
+import uuid
+from datetime import datetime
+from io import BytesIO
+import pandas as pd
+
+from utils.srs_utils import (CARD_COLUMNS,
+                             new_card,
+                             review_card,
+                             is_graduated)
+from utils.storage_utils import (NamespacedStorage,
+                                 get_user_storage,
+                                 run_in_background)
+from utils.metrics_utils import traced
+
+# 학습 기록은 추가 전용 이벤트 로그(events.log)에 쌓고,
+# 주기적으로 오답/마크 스냅샷(CSV)으로 압축한 뒤 반영된 로그 조각을 지운다.
+# 여러 기기에서 같은 기록을 고쳐도 결과가 같도록, 단어마다 마지막으로 반영한 이벤트의 (시각, id)를 두고
+# 더 나중 이벤트만 반영한다 (last-writer-wins). 복습 결과 이벤트도 계산된 복습 상태를 그대로 담으므로
+# 이벤트를 받는 순서와 무관하게 같은 상태가 된다. 삭제(마크 취소, 복습 졸업)는 삭제 표시(tombstone)로 남긴다.
+EVENT_LOG = "events.log"
+INCORRECT_FILE = "incorrect_words.csv"
+MARKED_FILE = "marked_words.csv"
+INCORRECT_COLUMNS = ["Day", "Word", "Meaning", "Date"] + CARD_COLUMNS
+MARKED_COLUMNS = ["Word", "Meaning", "Day", "Date"]
+SYNC_COLUMNS = ["Updated", "EventId", "Deleted"]  # 스냅샷 행의 마지막 반영 이벤트 (시각, id)와 삭제 여부
+COMPACT_EVERY = 200  # 이 프로세스에서 한 사용자의 이벤트가 이만큼 쌓이면 압축
+COMPACT_SEGMENTS = 50  # 불러올 때 로그 조각이 이보다 많으면 압축
+TOMBSTONE_TTL = 30 * 24 * 60 * 60  # 삭제 표시를 스냅샷에 남겨 두는 기간(초)
+TRANSFER_CHUNK_SIZE = 1000  # 내보내기/가져오기 시 한 번에 다루는 행/이벤트/로그 조각 수
+
+DEVICE_ID = uuid.uuid4().hex[:12]  # 이 프로세스에서 만든 이벤트의 출처
+_event_seq = itertools.count()
+_lock = threading.Lock()
+_events_since_compaction = {}  # 사용자 영역 -> 마지막 압축 이후 추가한 이벤트 수
+_compaction_locks = {}  # 사용자 영역 -> 압축 잠금
+
+
+def _plain(value): # numpy 값 등을 JSON에 저장할 수 있는 값으로 변환
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+def make_event(event_type, current_word, **fields): # 로그에 남길 이벤트 생성 ("answer" 또는 "mark")
+    event = {
+        "type": event_type,
+        "id": f"{DEVICE_ID}-{next(_event_seq):010d}",
+        "ts": time.time(),
+        "Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "Day": current_word.get("Day", "Unspecified"),
+        "Word": current_word["Word"],
+        "Meaning": current_word.get("Meaning", "No meaning provided"),
+    }
+    event.update(fields)
+    return event
+
+@traced("events.append")
+def append_events(*events): # 현재 사용자의 로그에 이벤트 추가 (변경분만 저장)
+    storage = get_user_storage()
+    data = "".join(json.dumps(event, ensure_ascii=False, default=_plain) + "\n" for event in events)
+    storage.append(EVENT_LOG, data.encode("utf-8"))
+
+    with _lock:
+        count = _events_since_compaction.get(storage.namespace, 0) + len(events)
+        compact = count >= COMPACT_EVERY
+        _events_since_compaction[storage.namespace] = 0 if compact else count
+    if compact:
+        schedule_compaction(storage.namespace)
+
+
+def _missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+def event_key(event): # 이벤트 순서 (시각, id), id가 없는 예전 이벤트는 시각만 사용
+    return float(event["ts"]), str(event.get("id") or "")
+
+def row_key(row): # 행에 마지막으로 반영된 이벤트의 순서
+    updated = row.get("Updated")
+    event_id = row.get("EventId")
+    return (0.0 if _missing(updated) else float(updated)), ("" if _missing(event_id) else str(event_id))
+
+def is_deleted(row):
+    value = row.get("Deleted")
+    if isinstance(value, str):
+        return value == "True"
+    return not _missing(value) and bool(value)
+
+def _tombstone(word, event):
+    return {"Word": word, "Day": event.get("Day"), "Meaning": event.get("Meaning"), "Deleted": True}
+
+def _merge(rows, word, row, key): # 더 나중 이벤트의 행이면 반영하고 True
+    current = rows.get(word)
+    if current is not None and row_key(current) >= key:
+        return False
+    row["Updated"], row["EventId"] = key
+    row["Deleted"] = bool(row.get("Deleted", False))
+    rows[word] = row
+    return True
+
+def apply_event(incorrect, marked, event): # 이벤트 하나를 오답/마크 집합(단어 -> 행)에 반영, 바뀐 (집합 이름, 단어) 반환
+    if event["type"] == "row":
+        # 가져온(import) 스냅샷 행은 행에 기록된 (시각, id) 순서로 병합
+        row = dict(event["row"])
+        rows = incorrect if event["kind"] == "incorrect" else marked
+        return (event["kind"], row["Word"]) if _merge(rows, row["Word"], row, row_key(row)) else None
+    word = event["Word"]
+    key = event_key(event)
+    if event["type"] == "answer":
+        current = incorrect.get(word)
+        live = current is not None and not is_deleted(current)
+        if event["result"] == "Incorrect" and event.get("mode") == "learn":
+            # 학습 중 틀리면 복습 일정을 처음부터 다시 시작
+            row = {column: event.get(column) for column in INCORRECT_COLUMNS}
+            row.update(new_card(event["ts"]))
+        elif event.get("mode") == "review":
+            if "Ease" in event:
+                # 복습 결과로 계산된 상태를 그대로 사용
+                row = {column: event.get(column) for column in INCORRECT_COLUMNS}
+                if live:
+                    row["Date"] = current.get("Date")
+            elif live:
+                # 복습 상태가 없는 예전 이벤트는 현재 상태에서 계산
+                row = dict(current)
+                row.update(review_card(row, event["result"] == "Correct", event["ts"]))
+            else:
+                return None
+            if is_graduated(row):
+                row = _tombstone(word, event)  # 충분히 외운 단어는 오답 목록에서 제외
+        else:
+            return None
+        return ("incorrect", word) if _merge(incorrect, word, row, key) else None
+    if event["type"] == "mark":
+        if event["marked"]:
+            row = {column: event.get(column) for column in MARKED_COLUMNS}
+        else:
+            row = _tombstone(word, event)
+        return ("marked", word) if _merge(marked, word, row, key) else None
+    return None
+
+def _rows(dataframe): # 스냅샷 데이터프레임을 {단어: 행} 으로 변환 (삭제 표시 포함)
+    if dataframe is None or dataframe.empty:
+        return {}
+    rows = {}
+    for row in dataframe.to_dict("records"):
+        row["Updated"], row["EventId"] = row_key(row)
+        row["Deleted"] = is_deleted(row)
+        rows[row["Word"]] = row
+    return rows
+
+def live_rows(rows): # 삭제 표시를 뺀 행
+    return {word: row for word, row in rows.items() if not is_deleted(row)}
+
+def to_dataframe(rows, columns):
+    return pd.DataFrame(list(live_rows(rows).values()), columns=columns)
+
+def _snapshot_dataframe(rows, columns, now): # 스냅샷 저장용 (오래된 삭제 표시는 버림)
+    kept = [row for row in rows.values()
+            if not is_deleted(row) or row_key(row)[0] >= now - TOMBSTONE_TTL]
+    return pd.DataFrame(kept, columns=columns + SYNC_COLUMNS)
+
+
+class ProgressReplica: # 한 세션이 가진 오답/마크 복제본, 바뀐 스냅샷과 새 로그 조각만 받아 병합
+    def __init__(self):
+        self.incorrect = {}  # 단어 -> 행 (삭제 표시 포함)
+        self.marked = {}
+        self.seen = set()  # 이미 반영한 로그 조각 id
+        self.versions = {}  # 스냅샷 파일 -> 마지막으로 받은 버전
+        self.last_segment_id = None
+        self.segment_count = 0
+
+    def apply(self, event): # 이 세션에서 만든 이벤트를 바로 반영
+        return apply_event(self.incorrect, self.marked, event)
+
+    @traced("events.fetch")
+    def fetch(self, storage): # 바뀐 스냅샷과 새 로그 조각만 받아 옴 (복제본을 바꾸지 않으므로 다른 스레드에서 실행 가능)
+        snapshots = [(name, *storage.read_versioned(name, self.versions.get(name)))
+                     for name in (INCORRECT_FILE, MARKED_FILE)]
+        segment_ids = storage.list_log(EVENT_LOG)
+        new_ids = [segment_id for segment_id in segment_ids if segment_id not in self.seen]
+        return snapshots, segment_ids, storage.read_log(EVENT_LOG, new_ids)
+
+    def merge(self, fetched): # fetch 결과를 병합하고 바뀐 (집합 이름, 단어) 집합 반환
+        snapshots, segment_ids, segments = fetched
+        changes = set()
+        for name, data, version in snapshots:
+            self.versions[name] = version
+            if data is None:
+                continue
+            rows, kind = (self.incorrect, "incorrect") if name == INCORRECT_FILE else (self.marked, "marked")
+            for word, row in _rows(pd.read_csv(BytesIO(data), float_precision="round_trip")).items():
+                if _merge(rows, word, row, row_key(row)):
+                    changes.add((kind, word))
+
+        for _, data in segments:
+            for line in data.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 기록 중 끊긴 줄은 건너뜀
+                changed = apply_event(self.incorrect, self.marked, event)
+                if changed:
+                    changes.add(changed)
+
+        # 압축으로 지워진 조각은 잊어버림
+        self.seen = set(segment_ids)
+        self.segment_count = len(segment_ids)
+        self.last_segment_id = max(segment_ids) if segment_ids else None
+        return changes
+
+    @traced("events.pull")
+    def pull(self, storage): # 바뀐 내용만 받아 병합하고 바뀐 (집합 이름, 단어) 집합 반환
+        return self.merge(self.fetch(storage))
+
+
+@traced("events.replay")
+def replay_progress(storage): # 스냅샷에 로그를 재생하여 오답/마크 집합을 복원
+    replica = ProgressReplica()
+    replica.pull(storage)
+    return replica.incorrect, replica.marked, replica.last_segment_id, replica.segment_count
+
+def _compaction_lock(namespace): # 사용자 영역마다 하나의 압축 잠금
+    with _lock:
+        return _compaction_locks.setdefault(namespace, threading.Lock())
+
+@traced("events.compact")
+def compact_event_log(storage): # 스냅샷을 갱신한 뒤 스냅샷에 반영된 로그 조각 삭제, 압축했으면 True
+    # 스냅샷 저장 후 삭제 전에 중단되어도, 같은 이벤트를 다시 반영하면 결과가 같으므로 데이터가 유지된다.
+    # 같은 영역의 압축은 이 프로세스에서 한 번에 하나만 실행한다. 스냅샷은 읽은 버전 그대로일 때만 저장하므로
+    # (다른 워커/기기의 압축이 먼저 저장했으면 실패) 더 오래된 내용으로 덮어쓰지 않고, 둘 다 저장한 경우에만 로그를 지운다.
+    with _compaction_lock(getattr(storage, "namespace", "")):
+        replica = ProgressReplica()
+        fetched = replica.fetch(storage)
+        replica.merge(fetched)
+        # 스냅샷에 실제로 반영한 조각만 지움 (그 사이 도착한 조각은 이름 순서와 관계없이 남김)
+        replayed = [segment_id for segment_id, _ in fetched[2] if segment_id is not None]
+        if not replayed:
+            return False
+        now = time.time()
+        for name, rows, columns in ((INCORRECT_FILE, replica.incorrect, INCORRECT_COLUMNS),
+                                    (MARKED_FILE, replica.marked, MARKED_COLUMNS)):
+            if not storage.save_df_if(_snapshot_dataframe(rows, columns, now), name, replica.versions.get(name)):
+                return False  # 로그는 그대로 두므로 다음 압축에서 다시 반영됨
+        storage.delete_log(EVENT_LOG, replayed)
+        return True
+
+def schedule_compaction(namespace): # 사용자 영역의 로그 압축을 쓰기 대기열 뒤에서 실행
+    run_in_background(lambda backend: compact_event_log(NamespacedStorage(backend, namespace)))
+
+def compact_if_needed(replica, namespace): # 로그 조각이 많이 쌓였으면 백그라운드에서 압축
+    if replica.segment_count > COMPACT_SEGMENTS:
+        schedule_compaction(namespace)
+
+def pull_progress(replica): # 현재 사용자의 복제본을 저장소와 동기화
+    storage = get_user_storage()
+    changes = replica.pull(storage)
+    compact_if_needed(replica, storage.namespace)
+    return changes
+
+def _json_line(record):
+    return json.dumps(record, ensure_ascii=False, default=_plain) + "\n"
+
+@traced("events.export")
+def export_progress(storage, out, chunk_size=TRANSFER_CHUNK_SIZE): # 스냅샷 행과 로그 이벤트를 JSON Lines로 차례로 내보내고 줄 수 반환
+    count = 0
+    for kind, name in (("incorrect", INCORRECT_FILE), ("marked", MARKED_FILE)):
+        stream = storage.open(name)
+        if stream is None:
+            continue
+        with stream:  # 스냅샷도 스트림에서 chunk_size행씩 읽어 내보냄
+            for chunk in pd.read_csv(stream, chunksize=chunk_size, float_precision="round_trip"):
+                chunk = chunk.astype(object).where(chunk.notna(), None)
+                for row in chunk.to_dict("records"):
+                    out.write(_json_line({"kind": kind, "row": row}))
+                    count += 1
+
+    # 로그는 조각 chunk_size개씩 받아 바로 내보냄 (전체를 메모리에 올리지 않음)
+    segment_ids = storage.list_log(EVENT_LOG)
+    for start in range(0, len(segment_ids), chunk_size):
+        for _, data in storage.read_log(EVENT_LOG, segment_ids[start:start + chunk_size]):
+            for line in data.splitlines():  # json은 바이트를 바로 읽으므로 조각 전체를 문자열로 바꾸지 않음
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 빈 줄이나 기록 중 끊긴 줄은 건너뜀
+                out.write(_json_line({"kind": "event", "event": event}))
+                count += 1
+    return count
+
+@traced("events.import")
+def import_progress(storage, lines, chunk_size=TRANSFER_CHUNK_SIZE): # export_progress 형식의 줄을 읽어 병합하고 {종류: 개수} 반환
+    # 이벤트와 스냅샷 행 모두 chunk_size개씩 로그 조각으로 덧붙인다. 스냅샷 행은 "row" 이벤트가 되어
+    # 다음 동기화/압축 때 기존 행과 (시각, id) 순서로 병합되므로, 가져오는 동안 스냅샷을 메모리에 올리지 않는다.
+    # 같은 파일을 다시 가져와도 결과는 같다.
+    counts = {"incorrect": 0, "marked": 0, "event": 0}
+    pending = []
+
+    def flush_events():
+        if pending:
+            storage.append(EVENT_LOG, "".join(pending).encode("utf-8"))
+            pending.clear()
+
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        kind = record.get("kind")
+        if kind == "event":
+            pending.append(_json_line(record["event"]))
+        elif kind in ("incorrect", "marked"):
+            pending.append(_json_line({"type": "row", "kind": kind, "row": record["row"]}))
+        else:
+            raise ValueError(f"알 수 없는 기록 종류입니다: {kind}")
+        counts[kind] += 1
+        if len(pending) >= chunk_size:
+            flush_events()
+    flush_events()
+    return counts
+
+def load_progress(): # 오답/마크 데이터프레임 불러오기
+    replica = ProgressReplica()
+    pull_progress(replica)
+    return to_dataframe(replica.incorrect, INCORRECT_COLUMNS), to_dataframe(replica.marked, MARKED_COLUMNS)
@@ -0,0 +1,115 @@
+import os
+import heapq
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.common_utils import (get_session_deck_id,
+                                get_session_vocabulary)
+
+# 학습 기록은 최근 HISTORY_SIZE개만 고정 크기 링 버퍼(numpy 배열)에 남기고,
+# 단어별 통계(시도/오답/마지막으로 본 시각)는 답안마다 O(1)로 갱신한다.
+# 세션이 길어져도 기록이 계속 늘어나지 않으며, 화면은 버퍼와 통계표만 읽는다.
+# HISTORY_SIZE: 남겨 둘 최근 답안 수
+DEFAULT_HISTORY_SIZE = 200
+HISTORY_KEY = "answer_history"  # 단어장(내용 해시) -> AnswerHistory
+
+
+class AnswerRecord: # 학습 기록 한 건 (단어는 공유 단어장의 id로만 보관)
+    __slots__ = ("word_id", "correct", "ts")
+
+    def __init__(self, word_id, correct, ts=None):
+        self.word_id = word_id
+        self.correct = correct
+        self.ts = ts
+
+    @property
+    def result(self):
+        return "Correct" if self.correct else "Incorrect"
+
+
+class WordStats: # 단어 하나의 누적 통계
+    __slots__ = ("attempts", "errors", "last_seen")
+
+    def __init__(self):
+        self.attempts = 0
+        self.errors = 0
+        self.last_seen = 0.0
+
+
+class AnswerHistory: # 최근 답안 링 버퍼 + 단어별 통계
+    def __init__(self, size):
+        self.size = max(int(size), 1)
+        self._word_ids = np.empty(self.size, dtype=np.int32)
+        self._correct = np.empty(self.size, dtype=bool)
+        self._ts = np.empty(self.size, dtype=np.float64)
+        self._head = 0  # 다음에 쓸 자리
+        self._count = 0
+        self.total = 0  # 지금까지 기록한 답안 수 (버퍼에서 밀려난 것 포함)
+        self.stats = {}  # 단어 id -> WordStats (푼 적 있는 단어만)
+
+    def __len__(self):
+        return self._count
+
+    def record(self, word_id, is_correct, ts=None): # 답안 하나 반영 (O(1), 가장 오래된 기록을 덮어씀)
+        ts = time.time() if ts is None else ts
+        self._word_ids[self._head] = word_id
+        self._correct[self._head] = is_correct
+        self._ts[self._head] = ts
+        self._head = (self._head + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+        self.total += 1
+
+        stats = self.stats.get(word_id)
+        if stats is None:
+            stats = self.stats[word_id] = WordStats()
+        stats.attempts += 1
+        stats.errors += not is_correct
+        stats.last_seen = ts
+
+    def recent(self, n=None): # 최근 답안 n개 (최신순)
+        n = self._count if n is None else min(n, self._count)
+        return [AnswerRecord(int(self._word_ids[i]), bool(self._correct[i]), float(self._ts[i]))
+                for i in ((self._head - 1 - k) % self.size for k in range(n))]
+
+    def word_stats(self, word_id): # 단어 하나의 통계 (푼 적 없으면 None)
+        return self.stats.get(word_id)
+
+    def hardest(self, n=10): # 많이 틀린 단어 n개 [(단어 id, WordStats)] (오답 수, 오답률 순)
+        wrong = ((word_id, stats) for word_id, stats in self.stats.items() if stats.errors)
+        return heapq.nlargest(n, wrong, key=lambda item: (item[1].errors, item[1].errors / item[1].attempts))
+
+
+def get_answer_history(): # 현재 세션에서 선택한 단어장의 학습 기록
+    histories = st.session_state.setdefault(HISTORY_KEY, {})
+    deck_id = get_session_deck_id()
+    if deck_id not in histories:
+        histories[deck_id] = AnswerHistory(int(os.getenv("HISTORY_SIZE", DEFAULT_HISTORY_SIZE)))
+    return histories[deck_id]
+
+def record_history(word_id, is_correct): # 정답 확인 시 학습 기록 갱신
+    get_answer_history().record(word_id, is_correct)
+
+def _format_time(ts):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+def show_answer_history(recent=10, hardest=10): # 최근 학습 기록과 많이 틀린 단어 표
+    history = get_answer_history()
+    if not history.total:
+        return
+    words = get_session_vocabulary().words
+
+    st.subheader("최근 학습 기록")
+    st.dataframe(pd.DataFrame(
+        [{"Word": words[record.word_id], "Result": record.result, "Date": _format_time(record.ts)}
+         for record in history.recent(recent)],
+        columns=["Word", "Result", "Date"]), hide_index=True)
+
+    top = history.hardest(hardest)
+    if top:
+        st.subheader("많이 틀린 단어")
+        st.dataframe(pd.DataFrame(
+            [{"Word": words[word_id], "시도": stats.attempts, "오답": stats.errors,
+              "마지막 학습": _format_time(stats.last_seen)} for word_id, stats in top],
+            columns=["Word", "시도", "오답", "마지막 학습"]), hide_index=True)
@@ -0,0 +1,231 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.common_utils import get_session_vocabulary
+from utils.event_log_utils import (MARKED_COLUMNS,
+                                   ProgressReplica,
+                                   append_events,
+                                   compact_if_needed,
+                                   is_deleted,
+                                   live_rows)
+from utils.storage_utils import get_user_storage
+from utils.srs_utils import ReviewScheduler
+from utils.io_utils import (cancel_io,
+                            is_io_pending,
+                            submit_io,
+                            take_io_result)
+
+# SYNC_INTERVAL: 다른 기기의 변경 사항을 가져오는 최소 간격(초)
+# 변경 사항은 백그라운드에서 받아 오고(io_utils), 받은 결과는 스크립트 스레드에서 세션 인덱스에 병합한다.
+DEFAULT_SYNC_INTERVAL = 30
+SYNC_TASK = "sync_progress"
+
+
+class BitSet: # 단어 id 집합 (단어 하나당 1비트)
+    __slots__ = ("_bits", "_count")
+
+    def __init__(self, size):
+        self._bits = bytearray((size + 7) // 8)
+        self._count = 0
+
+    def __contains__(self, i):
+        return bool(self._bits[i >> 3] & (1 << (i & 7)))
+
+    def __len__(self):
+        return self._count
+
+    def add(self, i):
+        if i not in self:
+            self._bits[i >> 3] |= 1 << (i & 7)
+            self._count += 1
+
+    def discard(self, i): # 삭제했으면 True
+        if i not in self:
+            return False
+        self._bits[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+        self._count -= 1
+        return True
+
+    def discard_many(self, ids): # 여러 id를 한 번에 삭제하고 삭제한 수 반환
+        ids = np.unique(np.asarray(ids, dtype=np.int64))
+        if not len(ids):
+            return 0
+        bits = np.frombuffer(self._bits, dtype=np.uint8)  # bytearray를 복사하지 않고 그대로 수정
+        masks = (1 << (ids & 7)).astype(np.uint8)
+        present = (bits[ids >> 3] & masks) != 0
+        np.bitwise_and.at(bits, ids[present] >> 3, ~masks[present])
+        removed = int(present.sum())
+        self._count -= removed
+        return removed
+
+    def ids(self): # 포함된 id를 오름차순 int 배열로
+        flags = np.unpackbits(np.frombuffer(bytes(self._bits), dtype=np.uint8), bitorder="little")
+        return np.flatnonzero(flags).astype(np.int32)
+
+
+class WordIndex: # 단어 집합 인덱스 (포함 여부 확인/추가/삭제 O(1))
+    # 단어장에 있는 행은 실제로 마크한 행의 id 비트와 Date만 저장하고 (같은 단어가 여러 Day에 나와도 그 행을 보여줌),
+    # 단어장에 없거나 뜻이 다른 단어만 행을 따로 보관한다.
+    def __init__(self, vocabulary, columns, rows=()):
+        self.vocabulary = vocabulary
+        self.columns = list(columns)
+        self._ids = BitSet(len(vocabulary))
+        self._row_of = {}  # 단어 -> 마크한 단어장 행 id
+        self._dates = {}  # 단어장 행 id -> Date
+        self._extra = {}  # 단어장에 없는 단어 -> 행
+        self._dataframe = None  # 필요할 때만 만들고, 내용이 바뀌면 버림
+        for row in rows:
+            self.add(row)
+
+    @classmethod
+    def from_dataframe(cls, vocabulary, dataframe, columns):
+        if dataframe is None or dataframe.empty:
+            return cls(vocabulary, columns)
+        return cls(vocabulary, columns, dataframe.to_dict("records"))
+
+    def __contains__(self, word):
+        return word in self._row_of or word in self._extra
+
+    def __len__(self):
+        return len(self._row_of) + len(self._extra)
+
+    def add(self, row):
+        word = row["Word"]
+        self.remove(word)  # 단어마다 한 행만 (다른 Day의 같은 단어로 다시 마크하면 바꿈)
+        word_id = self.vocabulary.find(row)
+        if word_id is None:
+            self._extra[word] = row
+        else:
+            self._ids.add(word_id)
+            self._row_of[word] = word_id
+            self._dates[word_id] = row.get("Date")
+        self._dataframe = None
+
+    def remove(self, word): # 삭제했으면 True
+        word_id = self._row_of.pop(word, None)
+        if word_id is None:
+            removed = self._extra.pop(word, None) is not None
+        else:
+            removed = self._ids.discard(word_id)
+            self._dates.pop(word_id, None)
+        if removed:
+            self._dataframe = None
+        return removed
+
+    def remove_many(self, words): # 여러 단어를 한 번에 삭제하고 삭제한 단어 목록 반환
+        ids, removed = [], []
+        for word in dict.fromkeys(words):
+            word_id = self._row_of.pop(word, None)
+            if word_id is None:
+                if self._extra.pop(word, None) is not None:
+                    removed.append(word)
+            else:
+                ids.append(word_id)
+                self._dates.pop(word_id, None)
+                removed.append(word)
+        self._ids.discard_many(ids)
+        if removed and self._dataframe is not None:
+            # 만들어 둔 데이터프레임은 다시 만들지 않고 삭제한 단어만 한 번에 걸러냄
+            dataframe = self._dataframe
+            self._dataframe = dataframe[~dataframe["Word"].isin(removed)].reset_index(drop=True)
+        return removed
+
+    def to_dataframe(self):
+        if self._dataframe is None:
+            rows = [{**self.vocabulary.row(word_id), "Date": self._dates.get(word_id)}
+                    for word_id in self._ids.ids().tolist()]
+            self._dataframe = pd.DataFrame(rows + list(self._extra.values()), columns=self.columns)
+        return self._dataframe
+
+
+def get_progress_replica(): # 현재 세션의 오답/마크 복제본
+    if "progress_replica" not in st.session_state:
+        st.session_state.progress_replica = ProgressReplica()
+    return st.session_state.progress_replica
+
+def load_session_indexes(): # 지금까지 받은 기록으로 세션 인덱스를 만들고, 저장소의 기록은 백그라운드에서 받아 반영
+    replica = get_progress_replica()
+    if "review_scheduler" not in st.session_state:
+        st.session_state.review_scheduler = ReviewScheduler(live_rows(replica.incorrect).values())
+    if "marked_index" not in st.session_state:
+        st.session_state.marked_index = WordIndex(
+            get_session_vocabulary(), MARKED_COLUMNS, live_rows(replica.marked).values()
+        )
+    start_sync()
+    finish_sync()  # 금방 끝나면 바로 반영, 늦어지면 다음 재실행에서 반영
+
+def start_sync(): # 다른 기기의 변경 사항을 백그라운드에서 받아 오기 시작 (이미 받는 중이면 그대로 둠)
+    st.session_state.last_sync = time.time()
+    submit_io(SYNC_TASK, get_progress_replica().fetch, get_user_storage())
+
+def finish_sync(wait=None): # 다 받아 온 변경 사항을 세션 인덱스에 반영하고 바뀐 수 반환 (아직이면 0)
+    state, result = take_io_result(SYNC_TASK, wait)
+    if state == "error":
+        st.warning(f"학습 기록을 동기화하지 못했습니다: {result}")
+        return 0
+    if state != "done":
+        return 0
+
+    replica = get_progress_replica()
+    changes = replica.merge(result)
+    compact_if_needed(replica, get_user_storage().namespace)
+    apply_changes(replica, changes)
+    return len(changes)
+
+def is_syncing(): # 저장소의 기록을 아직 받아 오는 중인지
+    return is_io_pending(SYNC_TASK)
+
+def sync_session_indexes(force=False): # 다른 기기에서 바뀐 기록만 받아 세션 인덱스에 반영 (SYNC_INTERVAL마다 한 번)
+    if "review_scheduler" not in st.session_state or "marked_index" not in st.session_state:
+        load_session_indexes()
+        return 0
+    changes = finish_sync(wait=0)  # 지난 재실행에서 시작한 작업이 끝났으면 반영
+    interval = float(os.getenv("SYNC_INTERVAL", DEFAULT_SYNC_INTERVAL))
+    if force or time.time() - st.session_state.get("last_sync", 0) >= interval:
+        start_sync()
+        changes += finish_sync()
+    return changes
+
+def apply_changes(replica, changes): # 복제본에서 바뀐 단어를 복습 일정/마크 인덱스에 반영
+    scheduler, marked_index = st.session_state.review_scheduler, st.session_state.marked_index
+    for kind, word in changes:
+        if kind == "incorrect":
+            row = replica.incorrect[word]
+            if is_deleted(row):
+                scheduler.remove(word)
+            else:
+                scheduler.add(row)
+        else:
+            row = replica.marked[word]
+            if is_deleted(row):
+                marked_index.remove(word)
+            elif word not in marked_index:
+                marked_index.add(row)
+
+def reset_session_indexes(): # 사용자가 바뀌면 세션의 오답/마크 인덱스와 복제본을 버림
+    cancel_io(SYNC_TASK)  # 이전 사용자의 기록을 받는 중이면 결과를 버림
+    for key in ("review_scheduler", "marked_index", "progress_replica", "last_sync"):
+        st.session_state.pop(key, None)
+
+def record_events(*events): # 이벤트를 로그에 추가하고 세션 복제본에도 바로 반영 (다시 받을 때 중복 반영되지 않음)
+    append_events(*events)
+    replica = st.session_state.get("progress_replica")
+    if replica is None:
+        return
+    changes = {change for change in map(replica.apply, events) if change}
+    if "review_scheduler" in st.session_state and "marked_index" in st.session_state:
+        # 복습 일정은 복제본의 새 행을 그대로 가리키도록 갱신 (세션에 같은 행을 두 벌 두지 않음)
+        apply_changes(replica, changes)
+
+def get_marked_index(): # 마크된 단어 인덱스
+    if "marked_index" not in st.session_state:
+        load_session_indexes()
+    return st.session_state.marked_index
+
+def get_incorrect_index(): # 오답 단어 인덱스 (다음 복습 시각 순서의 복습 일정)
+    if "review_scheduler" not in st.session_state:
+        load_session_indexes()
+    return st.session_state.review_scheduler
@@ -0,0 +1,92 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import streamlit as st
+
+from utils.storage_utils import storage_status
+
+# 저장소 읽기는 스크립트 스레드 밖의 스레드 풀에서 실행하고, 페이지는 결과를 잠깐(IO_WAIT초)만 기다린 뒤 바로 그린다.
+# 늦게 끝난 작업의 결과는 다음 재실행에서 반영한다. 쓰기는 쓰기 대기열(WriteBehindStorage)이 백그라운드에서 반영한다.
+# IO_WORKERS: 스레드 수, IO_WAIT: 결과를 기다리는 최대 시간(초), IO_TIMEOUT: 이보다 오래 걸린 작업은 실패로 처리(초)
+DEFAULT_IO_WORKERS = 4
+DEFAULT_IO_WAIT = 0.3
+DEFAULT_IO_TIMEOUT = 30.0
+STATUS_POLL_INTERVAL = 2.0  # 진행 중인 작업이 있을 때 상태 표시를 다시 그리는 간격(초)
+TASKS_KEY = "io_tasks"
+
+
+class IoTask: # 세션에서 실행 중인 저장소 작업 하나
+    __slots__ = ("future", "started")
+
+    def __init__(self, future):
+        self.future = future
+        self.started = time.monotonic()
+
+
+@st.cache_resource
+def get_io_executor(): # 프로세스 전체에서 공유하는 저장소 입출력 스레드 풀
+    return ThreadPoolExecutor(max_workers=int(os.getenv("IO_WORKERS", DEFAULT_IO_WORKERS)),
+                              thread_name_prefix="storage-io")
+
+def _tasks():
+    return st.session_state.setdefault(TASKS_KEY, {})
+
+def submit_io(name, func, *args): # func(*args)를 백그라운드에서 실행 (같은 이름의 작업이 진행 중이면 새로 시작하지 않음)
+    tasks = _tasks()
+    if name not in tasks:
+        tasks[name] = IoTask(get_io_executor().submit(func, *args))
+    return tasks[name].future
+
+def cancel_io(name): # 작업 결과를 버림 (이미 실행 중인 작업은 끝까지 실행되지만 반영하지 않음)
+    task = _tasks().pop(name, None)
+    if task is not None:
+        task.future.cancel()
+
+def take_io_result(name, wait=None): # ("done", 결과) / ("pending", None) / ("error", 예외) / ("idle", None)
+    tasks = _tasks()
+    task = tasks.get(name)
+    if task is None:
+        return "idle", None
+    wait = float(os.getenv("IO_WAIT", DEFAULT_IO_WAIT)) if wait is None else wait
+    try:
+        result = task.future.result(timeout=wait)
+    except FutureTimeout:
+        if time.monotonic() - task.started < float(os.getenv("IO_TIMEOUT", DEFAULT_IO_TIMEOUT)):
+            return "pending", None
+        cancel_io(name)
+        return "error", TimeoutError("저장소 응답 시간이 초과되었습니다.")
+    except Exception as e:
+        del tasks[name]
+        return "error", e
+    del tasks[name]
+    return "done", result
+
+def is_io_pending(name): # 이름이 name인 작업이 아직 진행 중인지
+    task = st.session_state.get(TASKS_KEY, {}).get(name)
+    return task is not None and not task.future.done()
+
+def pending_io(): # 아직 끝나지 않은 작업 수
+    return sum(not task.future.done() for task in st.session_state.get(TASKS_KEY, {}).values())
+
+
+def _render_sync_status(): # 상태 표시, 진행 중인 작업이 있으면 True
+    reads = pending_io()
+    writes, error = storage_status()
+    if error:
+        st.caption(f"⚠️ {error} (다시 시도 중)")
+    if reads or writes:
+        st.caption(f"⏳ 동기화 중 (불러오기 {reads}건, 저장 대기 {writes}건)")
+        return True
+    st.caption("✅ 동기화됨")
+    return False
+
+@st.fragment(run_every=STATUS_POLL_INTERVAL)
+def _poll_sync_status(): # 진행 중인 작업이 끝날 때까지 상태만 다시 그리고, 끝나면 전체를 다시 실행하여 결과 반영
+    if not _render_sync_status():
+        st.rerun()
+
+def show_sync_status(): # 저장소 동기화 상태 (진행 중/동기화됨)
+    if pending_io() or storage_status()[0]:
+        _poll_sync_status()
+    else:
+        _render_sync_status()
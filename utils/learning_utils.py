@@ -2,199 +2,112 @@ import os
 import random
 import pandas as pd
 from datetime import datetime
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
 import streamlit as st
 
 from utils.common_utils import (initialize_session,
+                                get_session_vocabulary,
                                 handle_page_navigation,
                                 get_credentials_from_secret_manager,
                                 load_google_credentials,
                                 save_to_drive,
                                 find_file_in_drive)
+from utils.storage_utils import get_user_storage
+from utils.quiz_utils import get_options_for
+from utils.prefetch_utils import next_learning_question
+from utils.index_utils import (get_marked_index,
+                               record_events)
+from utils.event_log_utils import make_event
+from utils.metrics_utils import traced
+from utils.visual_utils import record_answer
+from utils.history_utils import record_history
+
+def delete_from_drive(file_name): # 설정된 저장소(구글 드라이브/로컬)의 현재 사용자 영역에서 지정된 파일을 삭제하는 함수.
+    try:
+        deleted = get_user_storage().delete(file_name)
+    except Exception as e:
+        st.error(f"파일 삭제 중 오류 발생: {e}")
+        return False
 
-def delete_from_drive(file_name): # Google Drive에서 지정된 파일을 삭제하는 함수.
-   
-   # Google Drive API 서비스 객체 생성
-    credentials = load_google_credentials() 
-    service = build("drive", "v3", credentials=credentials)
-
-    # Google Drive에서 파일 검색
-    file_id = find_file_in_drive(file_name, service)
-    if file_id:
-        try:
-            service.files().delete(fileId=file_id).execute()
-            return True
-        except Exception as e:
-            st.error(f"파일 삭제 중 오류 발생: {e}")
-            return False
-    else:
+    if not deleted:
         st.warning(f"'{file_name}' 파일을 찾을 수 없습니다.")
-        return False
+    return deleted
 
 
-def get_sequential_word(filtered_data): # 순차적으로 단어와 정답을 반환하는 함수"""
-    current_index = st.session_state.current_index
-    current_word = filtered_data.iloc[current_index]
+def get_current_word_id(selected_ids): # 현재 순서의 단어 id
+    return int(selected_ids[st.session_state.current_index])
+
+@traced("learn.get_sequential_word")
+def get_sequential_word(selected_ids): # 순차적으로 단어와 정답을 반환하는 함수"""
+    current_word = get_session_vocabulary().row(get_current_word_id(selected_ids))
     correct_answer = current_word['Meaning']
 
-    options = filtered_data['Meaning'].sample(4).tolist()
-    if correct_answer not in options:
-        options[0] = correct_answer
-    random.shuffle(options)
+    # 미리 만든 뜻 인덱스에서 정답과 겹치지 않는 보기를 뽑음 (데이터프레임 전체를 훑지 않음)
+    options = get_options_for([correct_answer])[0]
 
     return current_word, correct_answer, options
 
-def check_answer(user_input, correct_answer, filtered_data):
-    current_word = filtered_data.iloc[st.session_state.current_index]
-
-    if user_input == correct_answer:
+def check_answer(user_input, correct_answer, selected_ids):
+    is_correct = user_input == correct_answer
+    if is_correct:
         st.success("정답입니다!")
-        st.session_state.records.append({
-            "Word": current_word["Word"],
-            "Result": "Correct"
-        })
     else:
         st.error(f"오답입니다! 정답은: {correct_answer}")
-        st.session_state.records.append({
-            "Word": current_word["Word"],
-            "Result": "Incorrect"
-        })
+    word_id = get_current_word_id(selected_ids)
+    record_history(word_id, is_correct)  # 최근 기록 링 버퍼와 단어별 통계 갱신 (기록이 계속 늘어나지 않음)
+    record_answer(word_id, is_correct)  # 진도 카운터 갱신 (대시보드에서 다시 집계하지 않음)
 
 
-def move_to_next_word(filtered_data): # 다음 단어로 이동하는 함수
+def move_to_next_word(selected_ids): # 다음 단어로 이동하는 함수
     st.session_state.current_index += 1
-    if st.session_state.current_index >= len(filtered_data):
+    if st.session_state.current_index >= len(selected_ids):
         st.session_state.current_index = 0
         st.warning("모든 단어를 학습했습니다. 다시 처음부터 시작합니다.")
 
-def update_word_and_options(filtered_data): # 단어와 보기 선택지를 갱신하는 함수
-    current_word, correct_answer, options = get_sequential_word(filtered_data)
-    st.session_state.current_word = current_word
-    st.session_state.correct_answer = correct_answer
-    st.session_state.options = options
-
-from datetime import datetime
-import pandas as pd
+def update_word_and_options(selected_ids): # 단어와 보기 선택지를 갱신하는 함수 (미리 준비한 문제를 꺼냄)
+    question = next_learning_question(selected_ids)
+    st.session_state.current_word = question.word
+    st.session_state.correct_answer = question.answer
+    st.session_state.options = question.options
 
-def process_and_save_incorrect_answers(selected_option, correct_answer, current_word): # 오답 단어를 처리하고 구글 드라이브에 저장하는 함수
+def process_and_save_incorrect_answers(selected_option, correct_answer, current_word): # 오답 단어를 저장소의 이벤트 로그에 저장하는 함수
     # 정답 여부 확인
     if selected_option != correct_answer:
-        # 오답 데이터 생성
-        incorrect_entry = {
-            "Day": current_word.get("Day", "Unspecified"),  
-            "Word": current_word["Word"],                  
-            "Meaning": current_word.get("Meaning", "No meaning provided"),  
-            "Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S") 
-        }
-
-        # 오답 데이터 누적
-        if "unknown_words" not in st.session_state:
-            st.session_state.unknown_words = []  
-        st.session_state.unknown_words.append(incorrect_entry)
-
-        # 누적된 오답 데이터를 데이터프레임으로 변환
-        incorrect_df = pd.DataFrame(st.session_state.unknown_words)
-
-        # 구글 드라이브에 저장
-        save_incorrect_answers_to_drive(incorrect_df)
-
-        # 디버깅용 출력
-        # st.write("현재 저장된 오답 데이터프레임:")
-        # st.write(incorrect_df)
-
+        save_incorrect_answers_to_drive(current_word)
     else:
         st.write("정답입니다!")
+        record_events(make_event("answer", current_word, mode="learn", result="Correct"))
 
 
-from datetime import datetime
-
-def save_incorrect_answers_to_drive(filtered_data): # 오답 데이터를 구글 드라이브에 저장
-    
-    # 디버깅용 출력
-    # st.write("현재 filtered_data:")
-    # st.write(filtered_data)
-    # st.write("현재 records:")
-    # st.write(st.session_state.records)
-
-    # 'Incorrect' 상태인 단어만 필터링
-    incorrect_words = [record['Word'] for record in st.session_state.records if record['Result'] == 'Incorrect']
-    # st.write(f"오답 단어 목록: {incorrect_words}")  # 디버깅용 출력
-    
-    # 오답 단어를 포함하는 데이터프레임 필터링
-    incorrect_df = filtered_data[filtered_data["Word"].isin(incorrect_words)]
-
-    if incorrect_df.empty:
-        st.warning("오답 데이터가 없습니다. 저장을 건너뜁니다.")
-        return
-
-    # 데이터프레임 컬럼 구성 (Day, Word, Meaning, Date)
-    incorrect_df = incorrect_df.copy()  
-    incorrect_df["Day"] = incorrect_df.get("Day", "Unspecified")  
-    incorrect_df["Meaning"] = incorrect_df.get("Meaning", "No meaning provided")  
-    incorrect_df["Date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S") 
+def save_incorrect_answers_to_drive(current_word): # 오답 이벤트를 저장소의 로그에 추가 (전체 CSV를 다시 올리지 않음)
+    # 이미 불러온 오답 인덱스가 있으면 record_events가 바로 반영 (복습 모드에서 새 오답도 출제됨)
+    record_events(make_event("answer", current_word, mode="learn", result="Incorrect"))
 
-    # 디버깅 출력
-    # st.write("최종 저장 데이터프레임:")
-    # st.write(incorrect_df)
 
-    # 저장
-    if save_to_drive(incorrect_df, "incorrect_words.csv"):
-        st.success("단어가 구글드라이브에 저장되었습니다.")
 
-
-
-def initialize_marked_words_state(): 
-    if "marked_words" not in st.session_state:
-        st.session_state.marked_words = []  # 마크된 단어 목록
-    if "marked_words_df" not in st.session_state:
-        st.session_state.marked_words_df = pd.DataFrame(columns=["Word", "Meaning", "Day", "Date"])  # 마크 데이터프레임
+def initialize_marked_words_state(): # 마크된 단어 인덱스 (처음 한 번 저장소에서 불러옴)
+    return get_marked_index()
 
 def add_word_to_marked_list(word, current_word):
-    st.session_state.marked_words.append(word)  # 마크된 단어 추가
     new_entry = {
         "Word": current_word["Word"],
         "Meaning": current_word.get("Meaning", "No meaning provided"),
         "Day": current_word.get("Day", "Unspecified"),
         "Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
     }
-    st.session_state.marked_words_df = pd.concat(
-        [st.session_state.marked_words_df, pd.DataFrame([new_entry])], ignore_index=True
-    )
+    get_marked_index().add(new_entry)  # 마크된 단어 추가
     st.write(f"단어 '{word}'가 마크되었습니다.")  # 디버깅 메시지
 
 def remove_word_from_marked_list(word): # 단어를 마크 목록에서 제거.
-    
-    st.session_state.marked_words.remove(word)  # 마크된 단어 제거
-    st.session_state.marked_words_df = st.session_state.marked_words_df[
-        st.session_state.marked_words_df["Word"] != word
-    ]
+    get_marked_index().remove(word)  # 마크된 단어 제거
     st.write(f"단어 '{word}'가 마크에서 제거되었습니다.")  # 디버깅 메시지
 
 def toggle_mark_word(word, current_word):
-    initialize_marked_words_state()
+    marked_index = initialize_marked_words_state()
 
-    if word in st.session_state.marked_words:
+    if word in marked_index:
         remove_word_from_marked_list(word)
     else:
         add_word_to_marked_list(word, current_word)
 
-    # 디버깅 출력
-    # st.write("### 현재 마크된 단어 데이터프레임:")
-    # st.write(st.session_state.marked_words_df)
-
-    # 구글 드라이브에 저장/삭제
-    save_or_remove_marked_words(st.session_state.marked_words_df)
-
-
-def save_or_remove_marked_words(marked_words_df): # 마크된 단어를 구글 드라이브에 저장하거나 삭제.
-    if marked_words_df.empty:
-        # 마크된 단어가 없으면 파일 삭제
-        if delete_from_drive("marked_words.csv"):
-            st.warning("마크된 단어가 없습니다. 구글 드라이브에서 파일이 삭제되었습니다.")
-        return
-
-    # 데이터프레임을 구글 드라이브에 저장
-    if save_to_drive(marked_words_df, "marked_words.csv"):
-        st.success("마크된 단어가 구글 드라이브에 저장되었습니다.")
\ No newline at end of file
+    # 저장소의 이벤트 로그에 마크/마크 취소만 추가
+    record_events(make_event("mark", current_word, marked=word in marked_index))
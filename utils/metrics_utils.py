@@ -0,0 +1,190 @@
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# 함수 호출 횟수, 지연 시간 히스토그램, 주고받은 바이트 수를 세션별/프로세스 전체로 기록한다.
+# METRICS_EXPORT_PATH: 지표를 내보낼 파일 (.json이면 JSON, 그 외에는 Prometheus 텍스트 형식)
+DEFAULT_EXPORT_PATH = "metrics.prom"
+SESSION_KEY = "_metrics"
+# 지연 시간 히스토그램 구간 상한(초)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class Metric: # 이름 하나의 누적 통계
+    __slots__ = ("count", "errors", "total", "bytes", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.bytes = 0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, elapsed, nbytes=0, error=False):
+        self.count += 1
+        self.errors += bool(error)
+        self.total += elapsed
+        self.bytes += nbytes
+        self.buckets[bisect.bisect_left(BUCKETS, elapsed)] += 1
+
+    def quantile(self, q): # 히스토그램으로 추정한 분위수(초), 해당 구간의 상한값
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return BUCKETS[-1]
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_seconds": round(self.total, 6),
+            "bytes": self.bytes,
+            "buckets": {str(bound): n for bound, n in zip(BUCKETS, self.buckets)},
+        }
+
+
+class MetricsRegistry: # 이름 -> Metric (여러 스레드에서 기록)
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def observe(self, name, elapsed, nbytes=0, error=False):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Metric()
+            metric.observe(elapsed, nbytes, error)
+
+    def snapshot(self): # 이름 순으로 정렬한 (이름, 통계 dict) 목록
+        with self._lock:
+            return [(name, self._metrics[name].to_dict()) for name in sorted(self._metrics)]
+
+    def summary(self): # 화면 표시용 행 목록 (ms 단위)
+        with self._lock:
+            rows = []
+            for name in sorted(self._metrics):
+                metric = self._metrics[name]
+                rows.append({
+                    "name": name,
+                    "count": metric.count,
+                    "errors": metric.errors,
+                    "mean_ms": round(metric.total / metric.count * 1000, 2) if metric.count else None,
+                    "p50_ms": _ms(metric.quantile(0.5)),
+                    "p95_ms": _ms(metric.quantile(0.95)),
+                    "p99_ms": _ms(metric.quantile(0.99)),
+                    "total_ms": round(metric.total * 1000, 1),
+                    "bytes": metric.bytes,
+                })
+            return rows
+
+    def clear(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+def _ms(seconds):
+    if seconds is None:
+        return None
+    return seconds * 1000 if seconds != float("inf") else float("inf")
+
+
+PROCESS_METRICS = MetricsRegistry()
+
+
+def get_session_metrics(): # 현재 세션의 지표 (스크립트 실행 스레드가 아니면 None)
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    if SESSION_KEY not in st.session_state:
+        st.session_state[SESSION_KEY] = MetricsRegistry()
+    return st.session_state[SESSION_KEY]
+
+def record(name, elapsed, nbytes=0, error=False): # 프로세스 지표와 (가능하면) 세션 지표에 기록
+    PROCESS_METRICS.observe(name, elapsed, nbytes, error)
+    session_metrics = get_session_metrics()
+    if session_metrics is not None:
+        session_metrics.observe(name, elapsed, nbytes, error)
+
+
+class Span: # trace 블록 안에서 주고받은 바이트 수를 더함
+    __slots__ = ("bytes",)
+
+    def __init__(self, nbytes=0):
+        self.bytes = nbytes
+
+    def add_bytes(self, nbytes):
+        self.bytes += nbytes or 0
+
+
+@contextmanager
+def trace(name, nbytes=0): # with trace("이름") as span: ... 블록 실행 시간 기록
+    span = Span(nbytes)
+    start = time.perf_counter()
+    error = False
+    try:
+        yield span
+    except Exception:
+        error = True
+        raise
+    finally:
+        record(name, time.perf_counter() - start, span.bytes, error)
+
+def traced(name=None, payload=None): # 함수 호출 시간 기록 데코레이터, payload(result, *args, **kwargs) -> 바이트 수
+    def decorator(func):
+        metric_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with trace(metric_name) as span:
+                result = func(*args, **kwargs)
+                if payload is not None:
+                    span.add_bytes(payload(result, *args, **kwargs))
+                return result
+        return wrapper
+    return decorator
+
+def payload_size(data): # bytes/str 크기 (None이면 0)
+    if data is None:
+        return 0
+    if isinstance(data, str):
+        return len(data.encode("utf-8"))
+    return len(data)
+
+
+def to_prometheus(registry, prefix="vocab"): # Prometheus 텍스트 형식 (지표 묶음마다 TYPE 줄 뒤에 모든 이름의 값을 이어서 씀)
+    snapshot = [(f'name="{name}"', metric) for name, metric in registry.snapshot()]
+    lines = [f"# TYPE {prefix}_call_seconds histogram"]
+    for label, metric in snapshot:
+        cumulative = 0
+        for bound, n in metric["buckets"].items():
+            cumulative += n
+            le = "+Inf" if bound == "inf" else bound
+            lines.append(f'{prefix}_call_seconds_bucket{{{label},le="{le}"}} {cumulative}')
+        lines.append(f"{prefix}_call_seconds_sum{{{label}}} {metric['total_seconds']}")
+        lines.append(f"{prefix}_call_seconds_count{{{label}}} {metric['count']}")
+    for family, key in (("call_errors_total", "errors"), ("call_bytes_total", "bytes")):
+        lines.append(f"# TYPE {prefix}_{family} counter")
+        lines.extend(f"{prefix}_{family}{{{label}}} {metric[key]}" for label, metric in snapshot)
+    return "\n".join(lines) + "\n"
+
+def to_json(registry):
+    return json.dumps(dict(registry.snapshot()), ensure_ascii=False, indent=2)
+
+def export_metrics(path=None, registry=None): # 지표를 파일로 내보내고 경로 반환 (확장자로 형식 결정)
+    path = path or os.getenv("METRICS_EXPORT_PATH", DEFAULT_EXPORT_PATH)
+    registry = registry or PROCESS_METRICS
+    text = to_json(registry) if path.endswith(".json") else to_prometheus(registry)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return path
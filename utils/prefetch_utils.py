@@ -0,0 +1,147 @@
+import os
+from collections import deque
+import streamlit as st
+
+from utils.common_utils import get_session_vocabulary
+from utils.quiz_utils import get_options_for
+from utils.metrics_utils import traced
+
+# 다음 문제(단어, 정답, 섞인 보기)를 미리 K개 만들어 두고, "다음 단어로"를 누르면 deque에서 꺼내기만 한다.
+# 보기는 빈 자리만큼의 문제를 한 번에 뽑고(get_options_for), 화면을 다 그린 뒤에 채운다.
+# 학습모드와 복습모드는 같은 QuestionBuffer를 쓰고, 문제를 가져오는 곳(source)만 다르다.
+# PREFETCH_SIZE: 미리 준비할 문제 수 (0이면 필요할 때 한 문제씩 만듦)
+DEFAULT_PREFETCH_SIZE = 5
+BUFFERS_KEY = "question_buffers"
+
+
+class Question: # 미리 준비한 문제 하나
+    __slots__ = ("position", "word", "answer", "options")
+
+    def __init__(self, position, word, answer, options):
+        self.position = position  # 학습모드: selected_ids 안의 순서, 복습모드: None
+        self.word = word
+        self.answer = answer
+        self.options = options
+
+
+class QuestionBuffer: # 미리 준비한 문제 deque
+    def __init__(self, size):
+        self.size = size
+        self.key = None  # 문제를 만든 조건 (선택한 단어/Day 등), 바뀌면 버퍼를 비움
+        self.cursor = 0  # 학습모드에서 다음에 준비할 순서
+        self._queue = deque()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def peek(self):
+        return self._queue[0] if self._queue else None
+
+    def reset(self, key, cursor=0): # 준비한 문제를 버리고, 버린 문제 목록 반환
+        dropped = list(self._queue)
+        self._queue.clear()
+        self.key = key
+        self.cursor = cursor
+        return dropped
+
+    @traced("prefetch.fill")
+    def fill(self, source, minimum=0): # 빈 자리만큼 source(n) -> [(순서, 단어 행)]에서 받아 보기를 한 번에 만듦
+        missing = max(self.size, minimum) - len(self._queue)
+        if missing <= 0:
+            return 0
+        items = source(missing)
+        if not items:
+            return 0
+        answers = [word["Meaning"] for _, word in items]
+        for (position, word), answer, options in zip(items, answers, get_options_for(answers)):
+            self._queue.append(Question(position, word, answer, options))
+        return len(items)
+
+    def pop(self, source): # 다음 문제 (비어 있으면 바로 하나 만듦), 없으면 None
+        if not self._queue:
+            self.fill(source, minimum=1)
+        return self._queue.popleft() if self._queue else None
+
+
+def get_question_buffer(mode): # 모드("learn"/"review")별 문제 버퍼
+    buffers = st.session_state.setdefault(BUFFERS_KEY, {})
+    if mode not in buffers:
+        buffers[mode] = QuestionBuffer(int(os.getenv("PREFETCH_SIZE", DEFAULT_PREFETCH_SIZE)))
+    return buffers[mode]
+
+def reset_question_buffers(): # 준비한 문제를 모두 버림 (사용자 변경 시)
+    st.session_state.pop(BUFFERS_KEY, None)
+
+def _selected_days():
+    return tuple(st.session_state.get("selected_days") or ())
+
+
+def _learning_key(selected_ids): # 선택한 단어 id와 보기 Day 범위가 같으면 같은 키
+    return (len(selected_ids), hash(selected_ids.tobytes()), _selected_days())
+
+def _learning_source(buffer, selected_ids): # selected_ids를 순서대로 돌며 단어 행을 넘겨줌
+    def source(n):
+        vocabulary = get_session_vocabulary()
+        items = []
+        for _ in range(min(n, len(selected_ids))):
+            position = buffer.cursor
+            items.append((position, vocabulary.row(int(selected_ids[position]))))
+            buffer.cursor = (position + 1) % len(selected_ids)
+        return items
+    return source
+
+def next_learning_question(selected_ids): # 현재 순서(current_index)의 문제를 버퍼에서 꺼냄
+    buffer = get_question_buffer("learn")
+    key = _learning_key(selected_ids)
+    index = st.session_state.current_index
+    head = buffer.peek()
+    expected = head.position if head is not None else buffer.cursor
+    if buffer.key != key or expected != index:
+        buffer.reset(key, cursor=index)
+    return buffer.pop(_learning_source(buffer, selected_ids))
+
+def prefetch_learning_questions(selected_ids): # 화면을 그린 뒤 다음 문제를 미리 준비
+    buffer = get_question_buffer("learn")
+    if len(selected_ids) and buffer.key == _learning_key(selected_ids):
+        buffer.fill(_learning_source(buffer, selected_ids))
+
+
+def _review_source(scheduler): # 복습 시각이 된 단어를 우선순위 큐에서 꺼내 넘겨줌
+    def source(n):
+        items = []
+        while len(items) < n:
+            word = scheduler.pop_due()
+            if word is None:
+                break
+            items.append((None, word))
+        return items
+    return source
+
+def _check_review_buffer(scheduler): # 복습 큐나 보기 Day 범위가 바뀌었으면 꺼내 둔 단어를 되돌림
+    buffer = get_question_buffer("review")
+    key = (id(scheduler), _selected_days())
+    if buffer.key != key:
+        for question in buffer.reset(key):
+            scheduler.release(question.word["Word"])
+    return buffer
+
+def next_review_question(scheduler): # 복습할 다음 문제 (없으면 None)
+    buffer = _check_review_buffer(scheduler)
+    source = _review_source(scheduler)
+    while True:
+        question = buffer.pop(source)
+        # 꺼내 둔 사이 다른 기기에서 오답 목록에서 빠진 단어는 건너뜀
+        if question is None or question.word["Word"] in scheduler:
+            return question
+
+def prefetch_review_questions(scheduler): # 화면을 그린 뒤 다음 복습 문제를 미리 준비
+    _check_review_buffer(scheduler).fill(_review_source(scheduler))
+
+def release_review_questions(): # 복습모드를 떠날 때 미리 꺼내 둔 단어를 복습 큐로 되돌림
+    buffer = st.session_state.get(BUFFERS_KEY, {}).get("review")
+    scheduler = st.session_state.get("review_scheduler")
+    if buffer is None:
+        return
+    for question in buffer.reset(None):
+        if scheduler is not None:
+            scheduler.release(question.word["Word"])
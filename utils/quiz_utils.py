@@ -0,0 +1,143 @@
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.common_utils import (get_deck,
+                                get_session_deck_id)
+from utils.vocab_utils import neighbors_path
+from utils.metrics_utils import traced
+
+# 보기(오답 선택지)는 단어장을 불러올 때 한 번 만든 "Day별 고유 뜻" 인덱스에서 뽑는다.
+# 정답과 같은 뜻이나 중복된 뜻은 나오지 않으며, 여러 문제의 보기를 한 번에 만들 수 있다.
+# DISTRACTOR_MODE: "random"(선택한 Day에서 무작위) 또는 "confusable"(철자/뜻이 비슷한 보기, confusable_utils)
+DEFAULT_OPTION_COUNT = 4
+DISTRACTOR_MODES = {"random": "무작위", "confusable": "헷갈리는 보기"}
+DEFAULT_DISTRACTOR_MODE = "random"
+
+
+class MeaningIndex: # 단어장 전체의 고유 뜻 목록과 Day별 뜻 코드
+    def __init__(self, vocabulary):
+        codes, uniques = pd.factorize(vocabulary.meanings)  # 빈 뜻은 -1
+        self.meanings = np.asarray(uniques, dtype=object)
+        self.code_of = {meaning: code for code, meaning in enumerate(self.meanings)}
+        self.all_codes = np.arange(len(self.meanings), dtype=np.int32)
+        self.day_codes = {}
+        for day, word_ids in vocabulary.day_ids.items():  # 단어장을 불러올 때 만든 Day 인덱스 사용
+            day_codes = codes[word_ids]
+            self.day_codes[day] = np.unique(day_codes[day_codes >= 0]).astype(np.int32)
+        self._pools = {}
+
+    def pool(self, days=None): # 선택한 Day들의 고유 뜻 코드 (정렬됨), Day를 고르지 않았으면 전체
+        if not days:
+            return self.all_codes
+        key = tuple(sorted(days, key=str))
+        if key not in self._pools:
+            parts = [self.day_codes[day] for day in key if day in self.day_codes]
+            self._pools[key] = np.unique(np.concatenate(parts)) if parts else self.all_codes
+        return self._pools[key]
+
+    def sample_options(self, answers, days=None, n_options=DEFAULT_OPTION_COUNT, rng=None): # 정답 뜻 목록 -> 문제별 보기 목록
+        answer_codes = self.answer_codes(answers)
+        return self.to_meanings(sample_option_sets(self.pool(days), answer_codes, n_options, rng), answers)
+
+    def sample_confusable_options(self, answers, neighbors, n_options=DEFAULT_OPTION_COUNT, rng=None): # 정답과 비슷한 뜻을 보기로 사용
+        rng = rng or np.random.default_rng()
+        answer_codes = self.answer_codes(answers)
+        k = min(n_options - 1, max(len(self.all_codes) - 1, 0))
+        # 가까운 이웃 2k개 중 k개를 무작위로 골라 같은 단어라도 매번 보기가 조금씩 달라지게 함
+        candidates = np.asarray(neighbors[np.maximum(answer_codes, 0), :2 * k], dtype=np.int64)
+        candidates[answer_codes < 0] = -1
+        keys = np.where(candidates >= 0, rng.random(candidates.shape), 2.0)
+        distractors = np.take_along_axis(candidates, np.argsort(keys, axis=1)[:, :k], axis=1)
+        for row in np.flatnonzero((distractors < 0).any(axis=1)):  # 이웃이 모자라면 전체에서 무작위로 채움
+            chosen = set(distractors[row][distractors[row] >= 0].tolist())
+            extra = [code for code in sample_distractors(self.all_codes, answer_codes[row:row + 1], 2 * k, rng)[0]
+                     if code not in chosen][:k - len(chosen)]
+            distractors[row] = list(chosen) + extra
+        option_sets = np.concatenate([distractors, answer_codes[:, None]], axis=1)
+        order = np.argsort(rng.random(option_sets.shape), axis=1)
+        return self.to_meanings(np.take_along_axis(option_sets, order, axis=1), answers)
+
+    def answer_codes(self, answers): # 정답 뜻 -> 뜻 코드 (단어장에 없으면 -1)
+        return np.array([self.code_of.get(answer, -1) for answer in answers], dtype=np.int64)
+
+    def to_meanings(self, option_codes, answers): # (문제 수, 보기 수) 코드 배열 -> 보기 문자열 목록
+        options = self.meanings[np.maximum(option_codes, 0)]
+        # 단어장에 없는 정답(-1)은 원래 문자열로 채움
+        missing = option_codes < 0
+        if missing.any():
+            rows = np.nonzero(missing)[0]
+            options[missing] = np.asarray(answers, dtype=object)[rows]
+        return options.tolist()
+
+
+def sample_distractors(pool, answer_codes, k, rng=None): # 문제마다 정답을 제외한 서로 다른 뜻 코드 k개를 뽑음
+    rng = rng or np.random.default_rng()
+    pool = np.asarray(pool)
+    answer_codes = np.asarray(answer_codes)
+    n, size = len(answer_codes), len(pool)
+
+    # 정답이 pool 안에 있으면 그 위치를 건너뛰고 뽑는다
+    positions = np.searchsorted(pool, answer_codes)
+    in_pool = (positions < size) & (pool[np.minimum(positions, size - 1)] == answer_codes) if size else np.zeros(n, bool)
+    available = size - in_pool.astype(np.int64)
+    k = int(max(0, min(k, available.min(initial=size))))
+
+    # Floyd 알고리즘을 모든 문제에 대해 한 번에 수행 (문제당 O(k^2), pool 크기와 무관)
+    slots = np.empty((n, k), dtype=np.int64)
+    for step in range(k):
+        upper = available - k + step  # 이번 단계에서 뽑을 수 있는 최대 위치
+        candidate = (rng.random(n) * (upper + 1)).astype(np.int64)
+        taken = (slots[:, :step] == candidate[:, None]).any(axis=1)
+        slots[:, step] = np.where(taken, upper, candidate)
+
+    slots += in_pool[:, None] & (slots >= positions[:, None])
+    return pool[slots]
+
+def sample_option_sets(pool, answer_codes, n_options=DEFAULT_OPTION_COUNT, rng=None): # 정답과 오답 보기를 섞은 (문제 수, 보기 수) 코드 배열
+    rng = rng or np.random.default_rng()
+    answer_codes = np.asarray(answer_codes, dtype=np.int64)
+    distractors = sample_distractors(pool, answer_codes, n_options - 1, rng)
+    option_sets = np.concatenate([distractors, answer_codes[:, None]], axis=1)
+    order = np.argsort(rng.random(option_sets.shape), axis=1)
+    return np.take_along_axis(option_sets, order, axis=1)
+
+@st.cache_resource
+def get_meaning_index(deck_id): # 단어장(내용 해시)마다 한 번만 만드는 뜻 인덱스 (모든 세션이 공유)
+    return MeaningIndex(get_deck(deck_id))
+
+@st.cache_resource
+def get_confusable_neighbors(deck_id): # 단어장의 헷갈리는 보기 인덱스 (vocab_cli로 미리 만든 파일, 없으면 처음 쓸 때 만들어 저장)
+    from utils.confusable_utils import build_neighbors, read_neighbors, write_neighbors
+
+    index = get_meaning_index(deck_id)
+    path = neighbors_path(deck_id)
+    neighbors = read_neighbors(path, len(index.meanings))
+    if neighbors is None:
+        vocabulary = get_deck(deck_id)
+        neighbors = build_neighbors(vocabulary.words, vocabulary.meanings)
+        try:
+            write_neighbors(neighbors, path)
+        except OSError:
+            pass  # 캐시 폴더에 쓸 수 없으면 메모리에만 둠
+    return neighbors
+
+def get_distractor_mode(): # 현재 세션의 보기 방식 (홈 화면에서 선택, 기본값은 DISTRACTOR_MODE)
+    if "distractor_mode" not in st.session_state:
+        mode = os.getenv("DISTRACTOR_MODE", DEFAULT_DISTRACTOR_MODE)
+        st.session_state.distractor_mode = mode if mode in DISTRACTOR_MODES else DEFAULT_DISTRACTOR_MODE
+    return st.session_state.distractor_mode
+
+def get_session_rng(): # 세션마다 따로 쓰는 난수 생성기 (스레드 간 공유하지 않음)
+    if "rng" not in st.session_state:
+        st.session_state.rng = np.random.default_rng()
+    return st.session_state.rng
+
+@traced("quiz.sample_options")
+def get_options_for(answers): # 현재 세션에서 선택한 Day 범위로 보기 목록 생성
+    deck_id = get_session_deck_id()
+    index = get_meaning_index(deck_id)
+    if get_distractor_mode() == "confusable":
+        return index.sample_confusable_options(answers, get_confusable_neighbors(deck_id), rng=get_session_rng())
+    return index.sample_options(answers, st.session_state.get("selected_days"), rng=get_session_rng())
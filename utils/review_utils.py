@@ -2,9 +2,6 @@ import os
 import random
 import pandas as pd
 from datetime import datetime
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
 import streamlit as st
 
 from utils.common_utils import (initialize_session,
@@ -13,66 +10,51 @@ from utils.common_utils import (initialize_session,
                                 load_google_credentials,
                                 save_to_drive,
                                 find_file_in_drive)
-
-def load_incorrect_words_from_drive(): # 구글 드라이브에서 오답 데이터를 불러오기
-    credentials = load_google_credentials()
-    if not credentials:
-        st.warning("구글 인증 실패: 자격 증명이 없습니다.")
-        return pd.DataFrame()
-    drive_service = build("drive", "v3", credentials=credentials)
-    file_id = find_file_in_drive('incorrect_words.csv', drive_service)
-    if not file_id:
-        st.warning("구글 드라이브에서 'incorrect_words.csv' 파일을 찾을 수 없습니다.")
-        return pd.DataFrame()
-
+from utils.quiz_utils import get_options_for
+from utils.prefetch_utils import next_review_question
+from utils.event_log_utils import (make_event,
+                                   load_progress)
+from utils.index_utils import record_events
+from utils.srs_utils import review_card
+
+def load_incorrect_words_from_drive(): # 저장소의 스냅샷과 이벤트 로그로 오답 데이터를 복원
     try:
-        request = drive_service.files().get_media(fileId=file_id)
-        file_data = request.execute()
-        from io import StringIO
-        return pd.read_csv(StringIO(file_data.decode('utf-8')))
+        incorrect_df, _ = load_progress()
     except Exception as e:
         st.error(f"오답 데이터를 불러오는 중 오류 발생: {e}")
         return pd.DataFrame()
+    return incorrect_df
     
-def get_current_word(incorrect_df, current_index): # 현재 단어와 정답 반환.
-    if incorrect_df.empty or current_index >= len(incorrect_df):
-        return None, None
-    current_word = incorrect_df.iloc[current_index]
-    correct_answer = current_word["Meaning"]
-    return current_word, correct_answer
-
-def get_options(filtered_data, correct_answer): # 보기 선택지 생성.
-    if filtered_data.empty:
+def get_current_word(scheduler): # 복습 시각이 된 다음 단어, 정답, 보기 반환 (없으면 None, None, [])
+    question = next_review_question(scheduler)  # 미리 준비한 문제 버퍼에서 꺼냄
+    if question is None:
+        return None, None, []
+    return question.word, question.answer, question.options
+
+def get_options(selected_ids, correct_answer): # 보기 선택지 생성.
+    if len(selected_ids) == 0:
         return [correct_answer]  # 데이터가 없으면 정답만 반환
 
-    # 학습 페이지의 데이터프레임에서 무작위로 3개의 선택지 추출
-    options = filtered_data["Meaning"].dropna().sample(3, replace=False).tolist()
+    # 학습 페이지에서 선택한 Day 범위의 뜻 인덱스에서 정답을 제외한 3개의 선택지를 뽑아 정답과 섞음
+    return get_options_for([correct_answer])[0]
 
-    # 정답 추가
-    if correct_answer not in options:
-        options.append(correct_answer)
-
-    # 선택지 셔플
-    random.shuffle(options)
-    return options
-
-def check_answer_and_update(selected_option, correct_answer, current_word, incorrect_df, drive_service): # 정답 확인 버튼 동작 및 데이터 갱신 함수.
+def check_answer_and_update(selected_option, correct_answer, current_word, incorrect_df): # 정답 확인 버튼 동작 및 데이터 갱신 함수.
     incorrect_df = process_and_save_incorrect_answers(
-        selected_option, correct_answer, current_word, incorrect_df, drive_service
+        selected_option, correct_answer, current_word, incorrect_df
     )
     return incorrect_df
 
 
-def process_and_save_incorrect_answers(selected_option, correct_answer, current_word, incorrect_df, drive_service): # 오답 단어를 처리하고 데이터프레임을 갱신하며, 구글 드라이브에 저장.
+def process_and_save_incorrect_answers(selected_option, correct_answer, current_word, incorrect_df): # 오답 단어를 처리하고 데이터프레임을 갱신하며, 구글 드라이브에 저장.
     is_correct = verify_answer(selected_option, correct_answer)
 
     if is_correct:
         # 정답인 경우
         incorrect_df = remove_correct_word_from_df(current_word, incorrect_df)
-        save_incorrect_df_to_drive(incorrect_df, drive_service)
     else:
         # 오답인 경우
         show_incorrect_message(correct_answer)
+    save_review_answer(current_word, is_correct)
 
     return incorrect_df
 
@@ -90,18 +72,13 @@ def remove_correct_word_from_df(current_word, incorrect_df):
     # st.write(updated_df)
     return updated_df
 
-def save_incorrect_df_to_drive(incorrect_df, drive_service):
-    incorrect_df.to_csv("incorrect_words.csv", index=False)
-    file_metadata = {"name": "incorrect_words.csv", "mimeType": "text/csv"}
-    media = MediaFileUpload("incorrect_words.csv", mimetype="text/csv")
-    file_id = find_file_in_drive("incorrect_words.csv", drive_service)
-
-    if file_id:
-        drive_service.files().update(fileId=file_id, media_body=media).execute()
-    else:
-        drive_service.files().create(body=file_metadata, media_body=media).execute()
-
-    st.success("오답 데이터가 Google Drive에 저장되었습니다.")
+def save_review_answer(current_word, is_correct): # 복습 결과를 저장소의 이벤트 로그에 추가하고 이벤트 반환
+    result = "Correct" if is_correct else "Incorrect"
+    event = make_event("answer", current_word, mode="review", result=result)
+    # 계산된 복습 상태를 이벤트에 담아, 다른 기기에서도 받는 순서와 무관하게 같은 상태가 되도록 함
+    event.update(review_card(current_word, is_correct, event["ts"]))
+    record_events(event)
+    return event
 
 def show_incorrect_message(correct_answer):
     st.error(f"오답입니다! 정답은: {correct_answer}")
@@ -109,7 +86,7 @@ def show_incorrect_message(correct_answer):
 
 
 
-def move_to_next_word_and_update(incorrect_df, filtered_data): # 현재 복습 단어의 인덱스를 갱신하고, 단어와 선택지를 업데이트하는 함수.
+def move_to_next_word_and_update(incorrect_df, selected_ids): # 현재 복습 단어의 인덱스를 갱신하고, 단어와 선택지를 업데이트하는 함수.
 
     # 현재 인덱스 갱신
     if "current_index" in st.session_state:
@@ -135,7 +112,7 @@ def move_to_next_word_and_update(incorrect_df, filtered_data): # 현재 복습 
         # st.write(f"### Debug: 현재 단어 {st.session_state.current_word}")
 
         # 선택지 갱신
-        st.session_state.options = get_options(filtered_data, current_word["Meaning"])
+        st.session_state.options = get_options(selected_ids, current_word["Meaning"])
         return True
     except Exception as e:
         st.error(f"오류 발생: {e}")
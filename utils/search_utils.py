@@ -0,0 +1,103 @@
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.common_utils import get_deck
+from utils.metrics_utils import traced
+
+# 영어 단어와 한국어 뜻을 문자 n-gram 역색인으로 검색한다 (단어장을 불러올 때 한 번만 만듦).
+# 한글 음절은 자모로 풀어 색인하므로 "이려"나 "이ㄹ"처럼 입력 중인 글자로도 찾을 수 있다.
+# 검색어의 n-gram 목록(역색인)을 교집합으로 줄인 뒤 후보만 실제 문자열과 비교하며,
+# 단어 일치 > 단어 앞부분 > 단어 중간 > 뜻 앞부분 > 뜻 중간 순서로 보여준다.
+NGRAM_SIZES = (2, 3)
+DEFAULT_RESULT_LIMIT = 20
+_SEPARATORS = re.compile(r"[^\w]+")
+
+# 한글 음절은 NFKD로 초성/중성/종성(조합용 자모)으로 풀리고, 이를 입력할 때 쓰는 호환 자모(ㄱ, ㅏ ...)로 맞춘다.
+# 라틴 문자의 악센트(é)는 NFKD로 분리한 결합 문자를 지워 없앤다.
+_LEADS = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_VOWELS = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_TAILS = "ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+_COMPATIBILITY_JAMO = str.maketrans({**{chr(0x1100 + i): jamo for i, jamo in enumerate(_LEADS)},
+                                     **{chr(0x1161 + i): jamo for i, jamo in enumerate(_VOWELS)},
+                                     **{chr(0x11A8 + i): jamo for i, jamo in enumerate(_TAILS)}})
+_COMBINING_MARKS = re.compile(r"[\u0300-\u036f]+")
+
+
+def normalize_query(text): # 검색용 문자열 (NFKD, 소문자, 악센트/기호 제거, 한글은 호환 자모로)
+    text = _COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", str(text)).lower())
+    return " ".join(_SEPARATORS.sub(" ", text).split()).translate(_COMPATIBILITY_JAMO)
+
+def _ngrams(text, sizes=NGRAM_SIZES): # 앞뒤에 공백을 붙인 문자열의 n-gram (앞부분 검색은 " "로 시작하는 n-gram 사용)
+    return {text[i:i + n] for n in sizes for i in range(len(text) - n + 1)}
+
+
+class NgramIndex: # 문자열 목록의 n-gram -> 문자열 번호(정렬된 int32 배열) 역색인
+    def __init__(self, texts):
+        self.texts = [f" {normalize_query(text)} " if isinstance(text, str) else " " for text in texts]
+        grams = [_ngrams(text) for text in self.texts]
+        lengths = np.fromiter((len(g) for g in grams), dtype=np.int64, count=len(grams))
+        codes, uniques = pd.factorize(pd.Series([gram for g in grams for gram in g], dtype=object))
+        ids = np.repeat(np.arange(len(grams), dtype=np.int32), lengths)
+        order = np.lexsort((ids, codes))  # n-gram별로 모으고, 같은 n-gram 안에서는 번호 순
+        self.ids = ids[order]
+        self.indptr = np.zeros(len(uniques) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(uniques)), out=self.indptr[1:])
+        self.code_of = {gram: code for code, gram in enumerate(uniques)}
+
+    def postings(self, gram): # n-gram을 포함한 문자열 번호
+        code = self.code_of.get(gram)
+        if code is None:
+            return np.empty(0, dtype=np.int32)
+        return self.ids[self.indptr[code]:self.indptr[code + 1]]
+
+    def candidates(self, pattern): # pattern의 n-gram을 모두 가진 문자열 번호 (짧은 목록부터 교집합)
+        size = max(n for n in NGRAM_SIZES if n <= len(pattern)) if len(pattern) >= min(NGRAM_SIZES) else None
+        if size is None:
+            return None
+        lists = sorted((self.postings(pattern[i:i + size]) for i in range(len(pattern) - size + 1)), key=len)
+        result = lists[0]
+        for postings in lists[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, postings, assume_unique=True)
+        return result
+
+    def matches(self, pattern): # pattern을 실제로 포함한 문자열 번호 (n-gram 후보만 비교)
+        candidates = self.candidates(pattern)
+        if candidates is None:  # 한 글자(자모)는 색인하지 않으므로 직접 비교
+            return np.array([i for i, text in enumerate(self.texts) if pattern in text], dtype=np.int32)
+        texts = self.texts
+        return np.array([i for i in candidates.tolist() if pattern in texts[i]], dtype=np.int32)
+
+
+class SearchIndex: # 단어장의 단어/뜻 검색 인덱스
+    def __init__(self, vocabulary):
+        self.words = NgramIndex(vocabulary.words)
+        self.meanings = NgramIndex(vocabulary.meanings)
+
+    @traced("search.query")
+    def search(self, query, limit=DEFAULT_RESULT_LIMIT): # 검색어 -> 단어 id 목록 (관련도 순, 최대 limit개)
+        query = normalize_query(query)
+        if not query:
+            return np.empty(0, dtype=np.int32)
+        exact = f" {query} "
+        prefix = f" {query}"
+        results, seen = [], set()
+        # 앞부분 일치는 단어 경계(" ")를 포함한 n-gram으로, 중간 일치는 경계 없이 찾음
+        for index, pattern in ((self.words, exact), (self.words, prefix), (self.words, query),
+                               (self.meanings, prefix), (self.meanings, query)):
+            for word_id in index.matches(pattern).tolist():
+                if word_id not in seen:
+                    seen.add(word_id)
+                    results.append(word_id)
+                    if len(results) >= limit:
+                        return np.array(results, dtype=np.int32)
+        return np.array(results, dtype=np.int32)
+
+
+@st.cache_resource
+def get_search_index(deck_id): # 단어장(내용 해시)마다 한 번만 만드는 검색 인덱스 (모든 세션이 공유)
+    return SearchIndex(get_deck(deck_id))
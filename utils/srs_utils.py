@@ -0,0 +1,123 @@
+import heapq
+import itertools
+import math
+import time
+
+# SM-2 방식 간격 반복 복습 일정
+# 오답 단어마다 Ease(난이도 계수), Interval(복습 간격, 일), Reps(연속 정답 수), Due(다음 복습 시각)를 둔다.
+DAY_SECONDS = 24 * 60 * 60
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+RELEARN_DELAY = 60  # 틀린 단어는 1분 뒤 다시 복습
+GRADUATE_INTERVAL = 21  # 복습 간격이 이만큼(일) 길어지면 오답 목록에서 제외
+CARD_COLUMNS = ["Ease", "Interval", "Reps", "Due"]
+
+
+def _value(row, key, default): # 비어 있거나 NaN인 값은 기본값으로
+    value = row.get(key)
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return default
+    return value
+
+def new_card(now): # 새로 틀린 단어의 복습 상태 (바로 복습 대상)
+    return {"Ease": INITIAL_EASE, "Interval": 0.0, "Reps": 0, "Due": now}
+
+def fill_card(row, now=None): # 복습 상태가 없는 행(예전 스냅샷)을 새 카드 값으로 채우고 다음 복습 시각 반환
+    # 잘못된 값이면 행을 바꾸기 전에 예외가 난다.
+    card = new_card(time.time() if now is None else now)
+    due = float(_value(row, "Due", card["Due"]))
+    if math.isnan(due):
+        raise ValueError(f"복습 시각이 올바르지 않습니다: {row.get('Word')}")
+    for column in CARD_COLUMNS:
+        row[column] = _value(row, column, card[column])
+    row["Due"] = due
+    return due
+
+def review_card(card, correct, now): # 복습 결과로 다음 복습 상태 계산 (SM-2)
+    ease = float(_value(card, "Ease", INITIAL_EASE))
+    interval = float(_value(card, "Interval", 0.0))
+    reps = int(_value(card, "Reps", 0))
+
+    if not correct:
+        return {"Ease": max(MIN_EASE, ease - 0.2), "Interval": 0.0, "Reps": 0, "Due": now + RELEARN_DELAY}
+
+    reps += 1
+    if reps == 1:
+        interval = 1.0
+    elif reps == 2:
+        interval = 6.0
+    else:
+        interval = round(interval * ease, 2)
+    return {"Ease": ease, "Interval": interval, "Reps": reps, "Due": now + interval * DAY_SECONDS}
+
+def is_graduated(card): # 충분히 외운 단어인지
+    return float(_value(card, "Interval", 0.0)) >= GRADUATE_INTERVAL
+
+
+class ReviewScheduler: # 다음 복습 시각 순서로 단어를 꺼내는 우선순위 큐 (힙)
+    # 행은 복사하지 않고 받은 dict를 그대로 가리킨다 (세션에서는 동기화 복제본의 행을 함께 씀).
+    # 복습 상태가 빠진 행은 넣을 때 fill_card로 채우므로, 힙에는 항상 float 복습 시각이 들어간다.
+    def __init__(self, rows=()):
+        self._rows = {}  # 단어 -> 행 (Word, Meaning, Day, Ease, Interval, Reps, Due ...)
+        self._entries = {}  # 단어 -> 힙에 들어 있는 최신 항목 번호 (이전 항목은 꺼낼 때 버림)
+        self._counter = itertools.count()
+        self._heap = []
+        now = time.time()
+        for row in rows:
+            due = fill_card(row, now)
+            self._rows[row["Word"]] = row
+            entry = next(self._counter)
+            self._entries[row["Word"]] = entry
+            self._heap.append((due, entry, row["Word"]))
+        heapq.heapify(self._heap)
+
+    @classmethod
+    def from_dataframe(cls, dataframe):
+        if dataframe is None or dataframe.empty:
+            return cls()
+        return cls(dataframe.to_dict("records"))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, word):
+        return word in self._rows
+
+    def add(self, row): # 오답 단어 추가 (이미 있으면 새 행과 복습 상태로 바꿈)
+        due = fill_card(row)  # 실패하면 일정은 그대로
+        self._rows[row["Word"]] = row
+        self._push(row["Word"], due)
+
+    def remove(self, word): # 오답 목록에서 제외, 삭제했으면 True
+        self._entries.pop(word, None)
+        return self._rows.pop(word, None) is not None
+
+    def _push(self, word, due):
+        entry = next(self._counter)
+        self._entries[word] = entry
+        heapq.heappush(self._heap, (due, entry, word))
+
+    def _top(self): # 오래된 항목을 버리고 가장 먼저 복습할 항목 반환
+        while self._heap:
+            due, entry, word = self._heap[0]
+            if self._entries.get(word) == entry:
+                return due, word
+            heapq.heappop(self._heap)
+        return None
+
+    def next_due_time(self): # 다음 복습 시각 (없으면 None)
+        top = self._top()
+        return top[0] if top else None
+
+    def pop_due(self, now=None): # 복습 시각이 된 단어 하나를 꺼냄 (없으면 None), O(log n)
+        now = time.time() if now is None else now
+        top = self._top()
+        if top is None or top[0] > now:
+            return None
+        heapq.heappop(self._heap)
+        del self._entries[top[1]]
+        return self._rows[top[1]]
+
+    def release(self, word): # 꺼냈지만 채점하지 않은 단어를 원래 시각으로 되돌림
+        if word in self._rows and word not in self._entries:
+            self._push(word, self._rows[word]["Due"])
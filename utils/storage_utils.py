@@ -0,0 +1,870 @@
+import atexit
+import gzip
+import hashlib
+import io
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from io import BytesIO
+import pandas as pd
+import streamlit as st
+
+from utils.common_utils import (initialize_drive_service,
+                                find_file_in_drive,
+                                drive_query_value,
+                                get_user_id)
+from utils.metrics_utils import (trace,
+                                 traced,
+                                 payload_size)
+
+# 저장소 설정 (환경 변수)
+# STORAGE_BACKEND: "drive"(기본값) 또는 "local"
+# LOCAL_STORAGE_PATH: local 백엔드에서 사용할 SQLite 파일 경로
+DEFAULT_BACKEND = "drive"
+DEFAULT_LOCAL_PATH = "local_storage.db"
+# WRITE_BEHIND: "0"이면 쓰기 대기열 없이 바로 저장
+# WRITE_FLUSH_INTERVAL: 대기열 반영 주기(초), WRITE_MAX_PENDING: 즉시 반영할 요청 수
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_MAX_PENDING = 20
+DEFAULT_MAX_RETRY_DELAY = 60.0
+DEFAULT_EXIT_TIMEOUT = 10.0
+# 사용자별 파일은 "users/<사용자 ID>/" 아래에 저장 (드라이브에서는 폴더, 로컬에서는 이름 앞부분)
+# DRIVE_ROOT_FOLDER_ID: 드라이브에서 모든 파일을 둘 폴더 (없으면 서비스 계정의 최상위)
+USERS_FOLDER = "users"
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+# STORAGE_GZIP: "1"이면 드라이브에 올리는 파일을 gzip으로 압축 (읽을 때는 압축 여부를 보고 자동으로 풀기)
+GZIP_MAGIC = b"\x1f\x8b"
+GZIP_MIME_TYPE = "application/gzip"
+# 드라이브 v3에는 조건부 갱신(If-Match)이 없으므로 조건부 쓰기는 잠금 파일로 한 번에 하나씩 실행
+# (잠금 파일의 순서는 드라이브 서버의 생성 시각으로 정하고, 이 시간보다 오래된 잠금은 버려진 것으로 봄)
+DRIVE_LOCK_TTL = 60.0
+# 파일을 스트림으로 읽을 때(open) 한 번에 받는 크기와, 메모리 대신 임시 파일에 받기 시작하는 크기
+STREAM_CHUNK_SIZE = 1 << 20
+DOWNLOAD_SPOOL_SIZE = 8 << 20
+
+
+def _result_bytes(result, *args, **kwargs): # 읽은 바이트 수
+    return payload_size(result)
+
+def _data_bytes(result, storage, name, data, *args, **kwargs): # 쓴 바이트 수
+    return payload_size(data)
+
+def _log_bytes(result, *args, **kwargs): # 읽은 로그 조각 전체 바이트 수
+    return sum(payload_size(data) for _, data in result)
+
+def _versioned_bytes(result, *args, **kwargs): # 바뀐 경우에만 읽은 바이트 수
+    return payload_size(result[0])
+
+
+class Storage: # 저장소 공통 인터페이스 (파일 이름 -> 바이트)
+    def read(self, name): # 파일 내용을 bytes로 반환, 없으면 None
+        raise NotImplementedError
+
+    def write(self, name, data): # 파일 내용을 덮어쓰기 (없으면 생성)
+        raise NotImplementedError
+
+    def open(self, name): # 파일을 읽기 전용 바이너리 스트림으로 반환, 없으면 None (기본 구현은 전체를 읽음)
+        data = self.read(name)
+        return BytesIO(data) if data is not None else None
+
+    def delete(self, name): # 파일 삭제, 삭제했으면 True
+        raise NotImplementedError
+
+    def append(self, name, data): # 추가 전용 로그에 조각(segment) 하나를 덧붙임
+        raise NotImplementedError
+
+    def list_log(self, name): # 로그 조각 id 목록 (내용은 받지 않음)
+        raise NotImplementedError
+
+    def read_log(self, name, segment_ids=None): # 로그 조각을 [(조각 id, bytes), ...] 순서대로 반환 (segment_ids가 있으면 그 조각만)
+        raise NotImplementedError
+
+    def read_versioned(self, name, known_version=None): # (내용, 버전) 반환, 버전이 known_version과 같으면 내용은 None
+        data = self.read(name)
+        version = hashlib.sha256(data).hexdigest() if data is not None else None
+        if version == known_version:
+            return None, version
+        return data, version
+
+    def delete_log(self, name, segment_ids): # 주어진 로그 조각만 삭제 (목록에 없는 조각은 그대로 둠)
+        raise NotImplementedError
+
+    def write_if(self, name, data, version): # 현재 버전이 version(read_versioned의 버전, 없던 파일은 None)일 때만 덮어쓰기, 썼으면 True
+        # 기본 구현은 확인 후 쓰기라 원자적이지 않으므로 백엔드에서 조건부 쓰기로 다시 구현함
+        if self.read_versioned(name, version)[1] != version:
+            return False
+        self.write(name, data)
+        return True
+
+    def load_df(self, name): # CSV 파일을 데이터프레임으로 불러오기
+        data = self.read(name)
+        if data is None:
+            return None
+        # 문자열로 바꾸지 않고 바이트에서 바로 파싱 (시각/복습 상태의 실수는 저장한 값 그대로 읽음)
+        return pd.read_csv(BytesIO(data), float_precision="round_trip")
+
+    def save_df(self, dataframe, name): # 데이터프레임을 CSV로 저장
+        self.write(name, csv_bytes(dataframe))
+
+    def save_df_if(self, dataframe, name, version): # 버전이 그대로일 때만 데이터프레임 저장, 저장했으면 True
+        return self.write_if(name, csv_bytes(dataframe), version)
+
+
+def csv_bytes(dataframe): # 데이터프레임 -> CSV 바이트 (문자열을 거치지 않고 바이트 버퍼에 기록)
+    buffer = BytesIO()
+    dataframe.to_csv(buffer, index=False, encoding="utf-8")
+    return buffer.getvalue()
+
+def _http_error(): # 구글 API 오류 클래스 (드라이브 백엔드를 쓸 때만 googleapiclient를 불러옴)
+    from googleapiclient.errors import HttpError
+    return HttpError
+
+def _drive_time(value): # 드라이브 RFC 3339 시각 -> epoch 초
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+def decompress(data): # gzip으로 압축된 내용이면 풀어서 반환
+    if data is not None and data[:2] == GZIP_MAGIC:
+        return gzip.decompress(data)
+    return data
+
+
+class DriveStorage(Storage): # 구글 드라이브 저장소 ("a/b/file" 이름은 a/b 폴더 안의 file)
+    def __init__(self, drive_service=None, root_folder_id=None, compress=False):
+        self._drive_service = drive_service
+        self._root_id = root_folder_id
+        self._compress = compress
+        self._lock = threading.Lock()
+        self._file_ids = {}  # 파일 이름 -> fileId (있는 파일만), 생성/삭제 시 갱신
+        self._folder_ids = {}  # 폴더 경로 -> folderId (있는 폴더만)
+        self._segment_ids = {}  # (로그 이름, 조각 이름) -> fileId (list_log 때 갱신)
+
+    def _service(self):
+        if self._drive_service is None:
+            self._drive_service = initialize_drive_service()
+        return self._drive_service
+
+    def _folder_id(self, path, create=False): # 폴더 경로의 folderId (캐시), 없으면 create일 때만 생성
+        with self._lock:
+            if path in self._folder_ids:
+                return self._folder_ids[path]
+        parent_path, _, folder_name = path.rpartition("/")
+        parent_id = self._folder_id(parent_path, create) if parent_path else self._root_id
+        if parent_path and parent_id is None:
+            return None
+        folder_id = find_file_in_drive(folder_name, self._service(), parent_id, FOLDER_MIME_TYPE)
+        if folder_id is None:
+            if not create:
+                return None  # 다른 곳에서 만들 수 있으므로 없는 폴더는 캐시하지 않음
+            metadata = {"name": folder_name, "mimeType": FOLDER_MIME_TYPE}
+            if parent_id:
+                metadata["parents"] = [parent_id]
+            folder_id = self._service().files().create(body=metadata, fields="id").execute()["id"]
+        with self._lock:
+            self._folder_ids[path] = folder_id
+        return folder_id
+
+    def _parent(self, name, create=False): # 이름 -> (폴더 id, 파일 이름), 폴더가 없으면 폴더 id는 None
+        folder_path, _, base_name = name.rpartition("/")
+        if not folder_path:
+            return self._root_id, name
+        return self._folder_id(folder_path, create), base_name
+
+    def _find(self, name): # 캐시된 fileId 반환, 없으면 드라이브에서 (폴더 안으로 한정하여) 검색 후 캐시
+        with self._lock:
+            if name in self._file_ids:
+                return self._file_ids[name]
+        parent_id, base_name = self._parent(name)
+        if "/" in name and parent_id is None:
+            return None  # 폴더가 아직 없음
+        file_id = find_file_in_drive(base_name, self._service(), parent_id)
+        if file_id:
+            # 다른 워커/기기에서 만들 수 있으므로 없는 파일은 캐시하지 않음 (만들기 전에 항상 다시 검색)
+            self._remember(name, file_id)
+        return file_id
+
+    def _remember(self, name, file_id):
+        with self._lock:
+            self._file_ids[name] = file_id
+
+    def _forget(self, name):
+        with self._lock:
+            self._file_ids.pop(name, None)
+
+    @traced("drive.read", payload=_result_bytes)
+    def read(self, name):
+        file_id = self._find(name)
+        if not file_id:
+            return None
+        try:
+            return decompress(self._service().files().get_media(fileId=file_id).execute())
+        except _http_error() as e:
+            if e.resp.status != 404:
+                raise
+            # 다른 곳에서 삭제된 파일이면 캐시를 비우고 다시 검색
+            self._forget(name)
+            file_id = self._find(name)
+            if not file_id:
+                return None
+            return decompress(self._service().files().get_media(fileId=file_id).execute())
+
+    def open(self, name): # 조금씩 내려받아 임시 파일(작으면 메모리)에 모은 스트림, gzip이면 풀면서 읽음
+        from googleapiclient.http import MediaIoBaseDownload
+
+        for _ in range(2):
+            file_id = self._find(name)
+            if not file_id:
+                return None
+            spool = tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_SIZE)
+            try:
+                request = self._service().files().get_media(fileId=file_id)
+                downloader = MediaIoBaseDownload(spool, request, chunksize=STREAM_CHUNK_SIZE)
+                done = False
+                while not done:
+                    _, done = downloader.next_chunk()
+                break
+            except _http_error() as e:
+                spool.close()
+                if e.resp.status != 404:
+                    raise
+                # 다른 곳에서 삭제된 파일이면 캐시를 비우고 다시 검색
+                self._forget(name)
+        else:
+            return None
+        spool.seek(0)
+        compressed = spool.read(2) == GZIP_MAGIC
+        spool.seek(0)
+        return gzip.GzipFile(fileobj=spool, mode="rb") if compressed else spool
+
+    def _media(self, data, mimetype="text/csv"): # 임시 파일 없이 메모리 버퍼에서 바로 올림 (설정 시 gzip 압축)
+        from googleapiclient.http import MediaIoBaseUpload
+
+        if self._compress:
+            data, mimetype = gzip.compress(data), GZIP_MIME_TYPE
+        return MediaIoBaseUpload(BytesIO(data), mimetype=mimetype, resumable=False)
+
+    @traced("drive.write", payload=_data_bytes)
+    def write(self, name, data):
+        media = self._media(data)
+        file_id = self._find(name)  # 없는 파일은 캐시하지 않으므로 만들기 전에 드라이브를 다시 확인함
+        if file_id:
+            # 삭제 후 생성하지 않고 기존 파일을 갱신 (중간에 실패해도 데이터 유지)
+            try:
+                self._service().files().update(fileId=file_id, media_body=media).execute()
+                return
+            except _http_error() as e:
+                if e.resp.status != 404:
+                    raise
+                self._forget(name)
+
+        parent_id, base_name = self._parent(name, create=True)
+        file_metadata = {"name": base_name, "mimeType": media.mimetype()}
+        if parent_id:
+            file_metadata["parents"] = [parent_id]
+        created = self._service().files().create(
+            body=file_metadata, media_body=media, fields="id"
+        ).execute()
+        self._remember(name, created["id"])
+
+    @traced("drive.delete")
+    def delete(self, name):
+        file_id = self._find(name)
+        if not file_id:
+            return False
+        try:
+            self._service().files().delete(fileId=file_id).execute()
+        except _http_error() as e:
+            if e.resp.status != 404:
+                raise
+            self._forget(name)
+            return False
+        self._forget(name)
+        return True
+
+    @traced("drive.read_versioned", payload=_versioned_bytes)
+    def read_versioned(self, name, known_version=None): # 파일 메타데이터의 version만 먼저 확인
+        file_id = self._find(name)
+        if not file_id:
+            return None, None
+        try:
+            meta = self._service().files().get(fileId=file_id, fields="version,modifiedTime").execute()
+        except _http_error() as e:
+            if e.resp.status != 404:
+                raise
+            self._forget(name)
+            return Storage.read_versioned(self, name, known_version)
+        version = f"{meta.get('version')}:{meta.get('modifiedTime')}"
+        if version == known_version:
+            return None, version
+        return decompress(self._service().files().get_media(fileId=file_id).execute()), version
+
+    def _version(self, name): # 현재 버전 (read_versioned와 같은 형식, 파일이 없으면 None)
+        file_id = self._find(name)
+        if not file_id:
+            return None
+        try:
+            meta = self._service().files().get(fileId=file_id, fields="version,modifiedTime").execute()
+        except _http_error() as e:
+            if e.resp.status != 404:
+                raise
+            self._forget(name)
+            return self._version(name)
+        return f"{meta.get('version')}:{meta.get('modifiedTime')}"
+
+    def _acquire(self, name): # 파일 이름의 잠금 파일을 만들고, 가장 먼저 만든 잠금이면 그 fileId 반환 (아니면 지우고 None)
+        parent_id, base_name = self._parent(name, create=True)
+        metadata = {"name": f"{base_name}.lock.{uuid.uuid4().hex}", "appProperties": {"lock": name}}
+        if parent_id:
+            metadata["parents"] = [parent_id]
+        files = self._service().files()
+        lock_id = files.create(body=metadata, fields="id").execute()["id"]
+        query = f"appProperties has {{ key='lock' and value='{drive_query_value(name)}' }} and trashed = false"
+        if parent_id:
+            query += f" and '{parent_id}' in parents"
+        locks = files.list(q=query, orderBy="createdTime,name", fields="files(id, name, createdTime)",
+                           pageSize=100).execute().get("files", [])
+        created = {f["id"]: _drive_time(f["createdTime"]) for f in locks}
+        newest = created.get(lock_id, max(created.values(), default=0.0))
+        live = [f["id"] for f in locks if newest - created[f["id"]] < DRIVE_LOCK_TTL]
+        for f in locks:
+            if f["id"] not in live:
+                self._delete_quietly(f["id"])  # 중단된 워커가 남긴 잠금
+        if live and live[0] == lock_id:
+            return lock_id
+        self._delete_quietly(lock_id)
+        return None
+
+    def _delete_quietly(self, file_id): # 이미 지워진 파일이면 무시
+        try:
+            self._service().files().delete(fileId=file_id).execute()
+        except _http_error() as e:
+            if e.resp.status != 404:
+                raise
+
+    @traced("drive.write_if", payload=_data_bytes)
+    def write_if(self, name, data, version):
+        lock_id = self._acquire(name)
+        if lock_id is None:
+            return False  # 다른 워커/기기가 같은 파일을 조건부로 쓰는 중
+        try:
+            if self._version(name) != version:
+                return False
+            self.write(name, data)
+            return True
+        finally:
+            self._delete_quietly(lock_id)
+
+    def _list_segments(self, name): # 로그 조각 파일 목록 (이름 순 = 추가 순)
+        parent_id, _ = self._parent(name)
+        query = f"appProperties has {{ key='event_log' and value='{drive_query_value(name)}' }} and trashed = false"
+        if parent_id:
+            query += f" and '{parent_id}' in parents"
+        elif "/" in name:
+            return []  # 폴더가 아직 없음
+        segments, page_token = [], None
+        while True:
+            results = self._service().files().list(
+                q=query, orderBy="name", fields="nextPageToken, files(id, name)",
+                pageSize=1000, pageToken=page_token,
+            ).execute()
+            segments.extend(results.get("files", []))
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                return segments
+
+    @traced("drive.append", payload=_data_bytes)
+    def append(self, name, data):
+        parent_id, base_name = self._parent(name, create=True)
+        segment_name = f"{base_name}.{time.time_ns():020d}"
+        file_metadata = {"name": segment_name, "appProperties": {"event_log": name}}
+        if parent_id:
+            file_metadata["parents"] = [parent_id]
+        media = self._media(data, mimetype="application/x-ndjson")
+        self._service().files().create(body=file_metadata, media_body=media, fields="id").execute()
+
+    @traced("drive.list_log")
+    def list_log(self, name):
+        segments = self._list_segments(name)
+        with self._lock:
+            self._segment_ids.update(((name, f["name"]), f["id"]) for f in segments)
+        return [f["name"] for f in segments]
+
+    @traced("drive.read_log", payload=_log_bytes)
+    def read_log(self, name, segment_ids=None):
+        if segment_ids is None:
+            segments = [(f["name"], f["id"]) for f in self._list_segments(name)]
+        else:
+            with self._lock:
+                known = {segment_id: self._segment_ids.get((name, segment_id)) for segment_id in segment_ids}
+            if not all(known.values()):
+                self.list_log(name)
+                with self._lock:
+                    known = {segment_id: self._segment_ids.get((name, segment_id)) for segment_id in segment_ids}
+            segments = [(segment_id, file_id) for segment_id, file_id in sorted(known.items()) if file_id]
+        files = self._service().files()
+        return [(segment_id, decompress(files.get_media(fileId=file_id).execute())) for segment_id, file_id in segments]
+
+    @traced("drive.delete_log")
+    def delete_log(self, name, segment_ids):
+        # 조각 이름은 쓴 쪽의 시계로 정해지므로 (시계 차이, 늦은 업로드) 이름 순서로 지우지 않고 받은 조각만 지움
+        segment_ids = set(segment_ids)
+        if not segment_ids:
+            return
+        with self._lock:
+            known = {segment_id: self._segment_ids.get((name, segment_id)) for segment_id in segment_ids}
+        if not all(known.values()):
+            known = {f["name"]: f["id"] for f in self._list_segments(name) if f["name"] in segment_ids}
+        for segment_id, file_id in known.items():
+            if not file_id:
+                continue
+            try:
+                self._service().files().delete(fileId=file_id).execute()
+            except _http_error() as e:
+                if e.resp.status != 404:
+                    raise
+            with self._lock:
+                self._segment_ids.pop((name, segment_id), None)
+
+
+class _LockedBlobReader(io.RawIOBase): # 공유 연결의 BLOB을 잠금 안에서 조금씩 읽는 스트림
+    def __init__(self, blob, lock):
+        self._blob = blob
+        self._lock = lock
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        with self._lock:
+            data = self._blob.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            with self._lock:
+                self._blob.close()
+        super().close()
+
+
+class LocalStorage(Storage): # 로컬 SQLite 저장소 (네트워크 없이 실행/부하 테스트용)
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "name TEXT PRIMARY KEY, data BLOB NOT NULL, modified REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS logs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, data BLOB NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS logs_name ON logs (name, id)")
+        self._conn.commit()
+
+    @traced("local.read", payload=_result_bytes)
+    def read(self, name):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM files WHERE name = ?", (name,)).fetchone()
+        return bytes(row[0]) if row else None
+
+    def open(self, name): # SQLite BLOB을 STREAM_CHUNK_SIZE씩 읽는 스트림 (blobopen이 없는 파이썬에서는 전체를 읽음)
+        if not hasattr(self._conn, "blobopen"):
+            return super().open(name)
+        with self._lock:
+            row = self._conn.execute("SELECT rowid FROM files WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return None
+            blob = self._conn.blobopen("files", "data", row[0], readonly=True)
+        return io.BufferedReader(_LockedBlobReader(blob, self._lock), buffer_size=STREAM_CHUNK_SIZE)
+
+    @traced("local.write", payload=_data_bytes)
+    def write(self, name, data):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (name, data, modified) VALUES (?, ?, ?)",
+                (name, sqlite3.Binary(data), time.time()),
+            )
+            self._conn.commit()
+
+    @traced("local.write_if", payload=_data_bytes)
+    def write_if(self, name, data, version): # 수정 시각(버전)을 확인하는 UPDATE 한 문장으로 원자적으로 덮어쓰기
+        with self._lock:
+            if version is None:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO files (name, data, modified) VALUES (?, ?, ?)",
+                    (name, sqlite3.Binary(data), time.time()),
+                )
+            else:
+                # 같은 시각에 두 번 써도 버전이 바뀌도록 이전 수정 시각보다 항상 크게 함
+                cursor = self._conn.execute(
+                    "UPDATE files SET data = ?, modified = MAX(?, modified + 0.000001) WHERE name = ? AND modified = ?",
+                    (sqlite3.Binary(data), time.time(), name, float(version)),
+                )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    @traced("local.delete")
+    def delete(self, name):
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM files WHERE name = ?", (name,))
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    @traced("local.append", payload=_data_bytes)
+    def append(self, name, data):
+        with self._lock:
+            self._conn.execute("INSERT INTO logs (name, data) VALUES (?, ?)", (name, sqlite3.Binary(data)))
+            self._conn.commit()
+
+    @traced("local.read_versioned", payload=_versioned_bytes)
+    def read_versioned(self, name, known_version=None): # 수정 시각을 버전으로 사용
+        with self._lock:
+            row = self._conn.execute("SELECT modified FROM files WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return None, None
+            version = repr(row[0])
+            if version == known_version:
+                return None, version
+            data = self._conn.execute("SELECT data FROM files WHERE name = ?", (name,)).fetchone()[0]
+        return bytes(data), version
+
+    @traced("local.list_log")
+    def list_log(self, name):
+        with self._lock:
+            rows = self._conn.execute("SELECT id FROM logs WHERE name = ? ORDER BY id", (name,)).fetchall()
+        return [row[0] for row in rows]
+
+    @traced("local.read_log", payload=_log_bytes)
+    def read_log(self, name, segment_ids=None):
+        if segment_ids is not None and not segment_ids:
+            return []
+        with self._lock:
+            if segment_ids is None:
+                rows = self._conn.execute(
+                    "SELECT id, data FROM logs WHERE name = ? ORDER BY id", (name,)
+                ).fetchall()
+            else:
+                placeholders = ", ".join("?" * len(segment_ids))
+                rows = self._conn.execute(
+                    f"SELECT id, data FROM logs WHERE name = ? AND id IN ({placeholders}) ORDER BY id",
+                    (name, *segment_ids),
+                ).fetchall()
+        return [(row[0], bytes(row[1])) for row in rows]
+
+    @traced("local.delete_log")
+    def delete_log(self, name, segment_ids):
+        segment_ids = list(segment_ids)
+        if not segment_ids:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM logs WHERE name = ? AND id = ?",
+                                   [(name, segment_id) for segment_id in segment_ids])
+            self._conn.commit()
+
+
+class WriteBehindStorage(Storage): # 저장 요청을 모아 백그라운드 스레드에서 한꺼번에 반영하는 저장소
+    def __init__(self, backend, flush_interval=DEFAULT_FLUSH_INTERVAL, max_pending=DEFAULT_MAX_PENDING,
+                 max_retry_delay=DEFAULT_MAX_RETRY_DELAY):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retry_delay = max_retry_delay
+        self.last_error = None
+        # 파일/로그 이름 -> (작업, 데이터). 파일은 마지막 요청만 남기고, 로그 조각은 한 조각으로 합침
+        self._pending = {}
+        self._changes = 0  # 마지막 반영 이후 들어온 요청 수
+        self._retries = {}  # 이름 -> (실패 횟수, 다음 시도 시각)
+        self._in_flight = {}  # 백그라운드에서 반영 중인 요청
+        self._tasks = []  # 대기 중인 요청을 반영한 뒤 실행할 작업 (예: 로그 압축)
+        self._cond = threading.Condition()
+        self._log_lock = threading.Lock()  # 로그 조각 추가와 로그 읽기가 겹치지 않도록
+        self._flush_requested = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush, DEFAULT_EXIT_TIMEOUT)
+
+    def _enqueue(self, name, op, data=None):
+        with self._cond:
+            if op == "append" and name in self._pending:
+                self._pending[name][1].append(data)
+            elif op == "append":
+                self._pending[name] = (op, [data])
+            else:
+                self._pending[name] = (op, data)
+            self._retries.pop(name, None)  # 새 요청은 바로 시도
+            self._changes += 1
+            if self._changes >= self.max_pending:
+                self._flush_requested = True
+                self._cond.notify_all()
+
+    def _pending_op(self, name): # 아직 저장소에 반영되지 않은 마지막 요청
+        with self._cond:
+            if name in self._pending:
+                return self._pending[name]
+            return self._in_flight.get(name)
+
+    def read(self, name):
+        pending = self._pending_op(name)
+        if pending is None:
+            return self.backend.read(name)
+        op, data = pending
+        if op == "delete":
+            return None
+        if op == "save_df":
+            return csv_bytes(data)
+        return data
+
+    def load_df(self, name):
+        pending = self._pending_op(name)
+        if pending is not None and pending[0] == "save_df":
+            return pending[1]
+        return super().load_df(name)
+
+    def write(self, name, data):
+        self._enqueue(name, "write", data)
+
+    def save_df(self, dataframe, name): # CSV 변환도 백그라운드에서 수행
+        self._enqueue(name, "save_df", dataframe)
+
+    def delete(self, name):
+        self._enqueue(name, "delete")
+        return True
+
+    def append(self, name, data):
+        self._enqueue(name, "append", data)
+
+    def open(self, name):
+        if self._pending_op(name) is not None:
+            return Storage.open(self, name)  # 대기 중인 내용
+        return self.backend.open(name)
+
+    def read_versioned(self, name, known_version=None):
+        if self._pending_op(name) is not None:
+            return Storage.read_versioned(self, name, known_version)
+        return self.backend.read_versioned(name, known_version)
+
+    def list_log(self, name): # 저장소에 반영된 조각만 (대기 중인 조각은 read_log에서 함께 반환)
+        return self.backend.list_log(name)
+
+    def read_log(self, name, segment_ids=None): # 저장된 조각 뒤에 아직 반영되지 않은 조각을 이어 붙여 반환
+        with self._log_lock:
+            segments = self.backend.read_log(name, segment_ids)
+            with self._cond:
+                buffered = [self._in_flight.get(name), self._pending.get(name)]
+        for item in buffered:
+            if item is not None and item[0] == "append":
+                segments.append((None, b"".join(item[1])))
+        return segments
+
+    def delete_log(self, name, segment_ids):
+        self.backend.delete_log(name, segment_ids)
+
+    def write_if(self, name, data, version): # 대기 중인 요청이 있으면 그 요청이 더 새로우므로 쓰지 않음
+        if self._pending_op(name) is not None:
+            return False
+        return self.backend.write_if(name, data, version)
+
+    def schedule(self, task): # 지금까지의 요청이 반영된 뒤 백그라운드에서 task(backend) 실행
+        with self._cond:
+            self._tasks.append(task)
+            self._flush_requested = True
+            self._cond.notify_all()
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._pending) + len(self._in_flight)
+
+    def flush(self, timeout=None): # 대기 중인 요청을 즉시 반영하고 끝날 때까지 기다림 (timeout=0이면 기다리지 않음)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._retries.clear()
+            self._cond.notify_all()
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _take_ready(self): # 지금 반영할 요청을 꺼냄 (재시도 대기 중인 항목은 제외)
+        now = time.monotonic()
+        ready = {}
+        for name, item in list(self._pending.items()):
+            retry = self._retries.get(name)
+            if retry and retry[1] > now:
+                continue
+            ready[name] = item
+            del self._pending[name]
+        tasks, self._tasks = self._tasks, []
+        self._in_flight = dict(ready)
+        self._changes = 0
+        self._flush_requested = False
+        return ready, tasks
+
+    def _apply(self, name, op, data):
+        if op == "save_df":
+            self.backend.save_df(data, name)
+        elif op == "write":
+            self.backend.write(name, data)
+        elif op == "append":
+            self.backend.append(name, b"".join(data))
+        else:
+            self.backend.delete(name)
+
+    def _requeue(self, name, op, data): # 실패한 요청을 되돌려 놓고 지수 백오프로 재시도
+        if op == "append":
+            # 실패한 조각은 그 사이 들어온 조각보다 앞에 있어야 순서가 유지됨
+            later = self._pending.pop(name, (op, []))[1]
+            self._pending[name] = (op, data + later)
+        elif name in self._pending:
+            return  # 더 새로운 요청이 있으면 실패한 요청은 버림
+        else:
+            self._pending[name] = (op, data)
+        attempts = self._retries.get(name, (0, 0))[0] + 1
+        delay = min(self.max_retry_delay, 2 ** attempts)
+        self._retries[name] = (attempts, time.monotonic() + delay)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._flush_requested:
+                    self._cond.wait(self.flush_interval)
+                ready, tasks = self._take_ready()
+
+            for name, (op, data) in ready.items():
+                try:
+                    with trace(f"write_behind.{op}"):
+                        if op == "append":
+                            with self._log_lock:
+                                self._apply(name, op, data)
+                                with self._cond:
+                                    self._in_flight.pop(name, None)
+                        else:
+                            self._apply(name, op, data)
+                except Exception as e:
+                    self.last_error = f"'{name}' 저장 실패: {e}"
+                    with self._cond:
+                        self._in_flight.pop(name, None)
+                        self._requeue(name, op, data)
+                else:
+                    with self._cond:
+                        self._retries.pop(name, None)
+                        if not self._retries:
+                            self.last_error = None
+                finally:
+                    with self._cond:
+                        self._in_flight.pop(name, None)
+                        self._cond.notify_all()
+
+            for task in tasks:
+                try:
+                    task(self.backend)
+                except Exception as e:
+                    self.last_error = f"백그라운드 작업 실패: {e}"
+
+
+class NamespacedStorage(Storage): # 공유 저장소 안의 사용자별 영역 (모든 이름 앞에 namespace/ 를 붙임)
+    def __init__(self, storage, namespace=""):
+        self.storage = storage
+        self.namespace = namespace
+        self._prefix = f"{namespace}/" if namespace else ""
+
+    def _name(self, name):
+        return self._prefix + name
+
+    def read(self, name):
+        return self.storage.read(self._name(name))
+
+    def write(self, name, data):
+        self.storage.write(self._name(name), data)
+
+    def open(self, name):
+        return self.storage.open(self._name(name))
+
+    def delete(self, name):
+        return self.storage.delete(self._name(name))
+
+    def append(self, name, data):
+        self.storage.append(self._name(name), data)
+
+    def list_log(self, name):
+        return self.storage.list_log(self._name(name))
+
+    def read_log(self, name, segment_ids=None):
+        return self.storage.read_log(self._name(name), segment_ids)
+
+    def read_versioned(self, name, known_version=None):
+        return self.storage.read_versioned(self._name(name), known_version)
+
+    def delete_log(self, name, segment_ids):
+        self.storage.delete_log(self._name(name), segment_ids)
+
+    def write_if(self, name, data, version):
+        return self.storage.write_if(self._name(name), data, version)
+
+    def load_df(self, name):
+        return self.storage.load_df(self._name(name))
+
+    def save_df(self, dataframe, name):
+        self.storage.save_df(dataframe, self._name(name))
+
+
+def user_namespace(user_id): # 사용자 ID -> 저장 영역 이름 (비어 있으면 공용 영역)
+    if not user_id:
+        return ""
+    safe_id = re.sub(r"[^A-Za-z0-9_.@-]", "_", user_id)[:64]
+    if safe_id != user_id:
+        # 바꾼 문자가 있으면 다른 ID와 겹치지 않도록 해시를 덧붙임
+        safe_id = f"{safe_id}-{hashlib.sha256(user_id.encode('utf-8')).hexdigest()[:8]}"
+    return f"{USERS_FOLDER}/{safe_id}"
+
+def create_storage(backend=None): # 설정에 따라 저장소 객체 생성
+    backend = (backend or os.getenv("STORAGE_BACKEND", DEFAULT_BACKEND)).lower()
+    if backend == "drive":
+        return DriveStorage(root_folder_id=os.getenv("DRIVE_ROOT_FOLDER_ID") or None,
+                            compress=os.getenv("STORAGE_GZIP", "0") == "1")
+    if backend == "local":
+        return LocalStorage(os.getenv("LOCAL_STORAGE_PATH", DEFAULT_LOCAL_PATH))
+    raise ValueError(f"알 수 없는 저장소 백엔드입니다: {backend}")
+
+@st.cache_resource
+def get_storage(): # 프로세스 전체에서 공유하는 저장소 객체
+    storage = create_storage()
+    if os.getenv("WRITE_BEHIND", "1") == "0":
+        return storage
+    return WriteBehindStorage(
+        storage,
+        flush_interval=float(os.getenv("WRITE_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)),
+        max_pending=int(os.getenv("WRITE_MAX_PENDING", DEFAULT_MAX_PENDING)),
+    )
+
+def get_user_storage(user_id=None): # 현재 세션 사용자의 저장 영역
+    if user_id is None:
+        user_id = get_user_id()
+    return NamespacedStorage(get_storage(), user_namespace(user_id))
+
+def run_in_background(task): # task(backend)를 쓰기 대기열 뒤에서 실행 (대기열이 없으면 바로 실행)
+    storage = get_storage()
+    if isinstance(storage, WriteBehindStorage):
+        storage.schedule(task)
+    else:
+        task(storage)
+
+def storage_status(): # (쓰기 대기열에 남은 요청 수, 마지막 저장 오류)
+    storage = get_storage()
+    if isinstance(storage, WriteBehindStorage):
+        return storage.pending_count(), storage.last_error
+    return 0, None
+
+def flush_storage(timeout=0): # 쓰기 대기열을 즉시 반영 (기본값은 기다리지 않음)
+    storage = get_storage()
+    if isinstance(storage, WriteBehindStorage):
+        return storage.flush(timeout)
+    return True
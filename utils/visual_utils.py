@@ -0,0 +1,135 @@
+from io import BytesIO
+import pandas as pd
+import streamlit as st
+
+from utils.common_utils import (get_deck,
+                                get_session_deck_id,
+                                get_session_vocabulary)
+from utils.index_utils import BitSet
+from utils.metrics_utils import traced
+
+# 진도 통계는 정답 확인(check_answer) 때마다 카운터만 갱신하고,
+# 대시보드는 전체 학습 기록을 다시 집계하지 않고 카운터를 그대로 보여준다.
+# 차트는 카운터(version)나 표시할 Day가 바뀌었을 때만 다시 그린다.
+STATS_KEY = "progress_stats"  # 단어장(내용 해시) -> ProgressStats
+
+
+class ProgressStats: # 세션의 누적 진도 카운터
+    __slots__ = ("attempts", "correct", "day_attempts", "day_correct", "day_learned",
+                 "learned", "streak", "best_streak", "version", "_chart")
+
+    def __init__(self, vocabulary_size):
+        self.attempts = 0
+        self.correct = 0
+        self.day_attempts = {}  # Day -> 시도 수
+        self.day_correct = {}  # Day -> 정답 수
+        self.day_learned = {}  # Day -> 한 번 이상 맞힌 단어 수
+        self.learned = BitSet(vocabulary_size)  # 한 번 이상 맞힌 단어 id
+        self.streak = 0
+        self.best_streak = 0
+        self.version = 0
+        self._chart = (None, None)  # ((version, Day 목록), PNG bytes)
+
+    def record(self, word_id, day, is_correct): # 답안 하나 반영 (O(1))
+        self.attempts += 1
+        self.day_attempts[day] = self.day_attempts.get(day, 0) + 1
+        if is_correct:
+            self.correct += 1
+            self.day_correct[day] = self.day_correct.get(day, 0) + 1
+            self.streak += 1
+            self.best_streak = max(self.best_streak, self.streak)
+            if word_id not in self.learned:
+                self.learned.add(word_id)
+                self.day_learned[day] = self.day_learned.get(day, 0) + 1
+        else:
+            self.streak = 0
+        self.version += 1
+
+    def day_summary(self, day_totals, days=None): # Day별 정답률과 남은 단어 수
+        days = list(days) if days else list(day_totals)
+        rows = []
+        for day in days:
+            attempts = self.day_attempts.get(day, 0)
+            correct = self.day_correct.get(day, 0)
+            learned = self.day_learned.get(day, 0)
+            rows.append({
+                "Day": day,
+                "시도": attempts,
+                "정답": correct,
+                "정답률(%)": round(correct / attempts * 100, 1) if attempts else 0.0,
+                "외운 단어": learned,
+                "남은 단어": day_totals.get(day, 0) - learned,
+            })
+        return pd.DataFrame(rows, columns=["Day", "시도", "정답", "정답률(%)", "외운 단어", "남은 단어"])
+
+    def chart(self, summary): # 현재 version의 차트 (PNG), 카운터가 바뀌지 않았으면 다시 그리지 않음
+        key = (self.version, tuple(summary["Day"]))
+        cached_key, image = self._chart
+        if cached_key != key:
+            image = render_chart(summary)
+            self._chart = (key, image)
+        return image
+
+
+@st.cache_resource
+def get_day_totals(deck_id): # 단어장의 Day별 단어 수 (모든 세션이 공유)
+    vocabulary = get_deck(deck_id)
+    if vocabulary.days is None:
+        return {"Unspecified": len(vocabulary)}
+    return {day: len(word_ids) for day, word_ids in vocabulary.day_ids.items()}
+
+def get_progress_stats(): # 현재 세션에서 선택한 단어장의 진도 카운터
+    stats = st.session_state.setdefault(STATS_KEY, {})
+    deck_id = get_session_deck_id()
+    if deck_id not in stats:
+        stats[deck_id] = ProgressStats(len(get_session_vocabulary()))
+    return stats[deck_id]
+
+def record_answer(word_id, is_correct): # 정답 확인 시 카운터 갱신
+    vocabulary = get_session_vocabulary()
+    day = vocabulary.days[word_id] if vocabulary.days is not None else "Unspecified"
+    get_progress_stats().record(word_id, day, is_correct)
+
+
+@traced("visual.render_chart")
+def render_chart(summary): # Day별 정답률/남은 단어 막대 차트를 PNG로 그림
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    labels = [str(day) for day in summary["Day"]]
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 3.5))
+    ax1.bar(labels, summary["정답률(%)"], color="tab:green")
+    ax1.set_ylim(0, 100)
+    ax1.set_title("Accuracy (%)")
+    ax2.bar(labels, summary["외운 단어"], color="tab:blue", label="learned")
+    ax2.bar(labels, summary["남은 단어"], bottom=summary["외운 단어"], color="lightgray", label="remaining")
+    ax2.set_title("Words")
+    ax2.legend()
+    for ax in (ax1, ax2):
+        ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
+
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return buffer.getvalue()
+
+def show_progress_summary(): # 진도 대시보드 (누적 카운터만 사용)
+    stats = get_progress_stats()
+    day_totals = get_day_totals(get_session_deck_id())
+    selected_days = st.session_state.get("selected_days") or list(stats.day_attempts)
+    summary = stats.day_summary(day_totals, selected_days)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("푼 문제", stats.attempts)
+    col2.metric("정답률", f"{stats.correct / stats.attempts * 100:.1f}%" if stats.attempts else "-")
+    col3.metric("연속 정답", stats.streak, help=f"최고 기록: {stats.best_streak}")
+    col4.metric("남은 단어", int(summary["남은 단어"].sum()) if not summary.empty else 0)
+
+    if summary.empty:
+        st.write("아직 학습 기록이 없습니다. 학습모드에서 문제를 풀어 보세요.")
+        return
+
+    st.dataframe(summary, hide_index=True)
+    st.image(stats.chart(summary))
@@ -0,0 +1,280 @@
+import hashlib
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from io import BytesIO
+import numpy as np
+import pandas as pd
+
+from utils.metrics_utils import traced
+
+# 단어장(xlsx)을 한 번만 파싱하여 내용 해시로 이름 붙인 Arrow 파일로 저장하고,
+# 이후에는 Arrow 파일을 메모리 매핑으로 바로 불러온다.
+# VOCAB_CACHE_DIR: Arrow 파일과 manifest.json을 저장할 디렉토리
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".vocab_cache")
+MANIFEST_FILE = "manifest.json"
+DECK_COLUMNS = ["Day", "Word", "Meaning"]  # Arrow 파일에 남기는 열 (Day는 없어도 됨)
+ARTIFACT_VERSION = 2  # Arrow 파일 형식이 바뀌면 올려서 예전 파일을 다시 만들게 함
+DEFAULT_CHUNK_SIZE = 5000  # 일괄 가져오기 시 한 번에 읽는 행 수
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def get_cache_dir(cache_dir=None):
+    return cache_dir or os.getenv("VOCAB_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+def is_url(source):
+    return source.startswith(("http://", "https://"))
+
+def content_hash(data): # 단어장 내용의 해시
+    return hashlib.sha256(data).hexdigest()
+
+def artifact_path(digest, cache_dir=None):
+    return os.path.join(get_cache_dir(cache_dir), f"{digest}.v{ARTIFACT_VERSION}.arrow")
+
+def neighbors_path(digest, cache_dir=None): # 헷갈리는 보기 인덱스 (Arrow 파일 옆에 저장)
+    return os.path.join(get_cache_dir(cache_dir), f"{digest}.v{ARTIFACT_VERSION}.neighbors.npy")
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_manifest(cache_dir, manifest):
+    path = os.path.join(cache_dir, MANIFEST_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+@traced("vocab.fetch", payload=lambda result, *args, **kwargs: len(result[0] or b""))
+def _fetch(source, etag=None): # (내용, etag) 반환, 서버가 304를 주면 내용은 None
+    if not is_url(source):
+        with open(source, "rb") as f:
+            return f.read(), None
+    request = urllib.request.Request(source)
+    if etag:
+        request.add_header("If-None-Match", etag)
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.read(), response.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, etag
+        raise
+
+def is_csv(source):
+    return source.lower().endswith(".csv")
+
+@traced("vocab.parse_xlsx", payload=lambda result, data, *args, **kwargs: len(data))
+def parse_workbook(data, csv=False): # xlsx(또는 CSV) 내용을 데이터프레임으로 변환 (캐시가 없을 때만 사용)
+    if csv:
+        return pd.read_csv(BytesIO(data), dtype=str)
+    return pd.read_excel(BytesIO(data), dtype=str)
+
+def normalize_deck(dataframe, source): # DECK_COLUMNS만 남기고 단어가 없는 행을 버린 뒤 모든 값을 문자열로 맞춤 (빈 칸은 None)
+    missing = {"Word", "Meaning"} - set(dataframe.columns)
+    if missing:
+        raise ValueError(f"{source}: 필요한 열이 없습니다: {', '.join(sorted(missing))}")
+    dataframe = dataframe[[column for column in DECK_COLUMNS if column in dataframe.columns]]
+    dataframe = dataframe[dataframe["Word"].notna()]
+    # 청크/파싱 방식마다 타입이 달라지지 않도록 모든 값을 문자열로 맞춤
+    return dataframe.astype(object).apply(lambda column: column.map(lambda value: None if pd.isna(value) else str(value)))
+
+def write_artifact(dataframe, path): # 압축하지 않은 Arrow(Feather v2) 파일로 저장하여 메모리 매핑이 가능하게 함
+    import pyarrow as pa  # pyarrow는 단어장을 처음 불러올 때 불러옴
+    import pyarrow.feather as feather
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    table = pa.Table.from_pandas(dataframe, preserve_index=False)
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+@traced("vocab.read_artifact")
+def read_artifact(path):
+    import pyarrow.feather as feather
+
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+def compile_vocabulary(source, cache_dir=None): # 단어장을 Arrow 파일로 변환하고 (해시, 경로) 반환
+    cache_dir = get_cache_dir(cache_dir)
+    manifest = _read_manifest(cache_dir)
+    entry = manifest.get(source, {})
+
+    try:
+        data, etag = _fetch(source, entry.get("etag"))
+    except (OSError, urllib.error.URLError):
+        # 네트워크 오류 시 이전에 만든 파일이 있으면 그대로 사용
+        if entry and os.path.exists(artifact_path(entry["sha256"], cache_dir)):
+            return entry["sha256"], artifact_path(entry["sha256"], cache_dir)
+        raise
+
+    if data is None:  # 304 Not Modified
+        digest = entry["sha256"]
+    else:
+        digest = content_hash(data)
+
+    path = artifact_path(digest, cache_dir)
+    if not os.path.exists(path):
+        if data is None:
+            data, etag = _fetch(source)
+            digest = content_hash(data)
+            path = artifact_path(digest, cache_dir)
+        # 일괄 가져오기(import_deck)와 같은 해시의 파일이므로 같은 방식으로 정리해서 저장
+        write_artifact(normalize_deck(parse_workbook(data, csv=is_csv(source)), source).reset_index(drop=True), path)
+
+    if entry.get("sha256") != digest or entry.get("etag") != etag:
+        manifest[source] = {"sha256": digest, "etag": etag}
+        _write_manifest(cache_dir, manifest)
+    return digest, path
+
+def file_hash(path): # 파일을 블록 단위로 읽어 내용 해시 계산 (content_hash와 같은 값)
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _xlsx_chunks(path, chunk_size): # 읽기 전용 모드로 시트를 한 줄씩 읽어 chunk_size 행씩 넘겨줌
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(value) if value is not None else "" for value in next(rows, ())]
+        chunk = []
+        for row in rows:
+            chunk.append(row[:len(header)])
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame(chunk, columns=header)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header)
+    finally:
+        workbook.close()
+
+def iter_deck_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE): # 단어장 파일을 chunk_size 행씩 읽어 DECK_COLUMNS 데이터프레임으로 넘겨줌
+    chunks = pd.read_csv(path, chunksize=chunk_size, dtype=str) if is_csv(path) else _xlsx_chunks(path, chunk_size)
+    for chunk in chunks:
+        yield normalize_deck(chunk, path)
+
+@traced("vocab.import_deck")
+def import_deck(source, cache_dir=None, chunk_size=DEFAULT_CHUNK_SIZE): # 로컬 xlsx/CSV 단어장을 청크 단위로 Arrow 파일에 기록하고 (해시, 경로, 행 수) 반환
+    import pyarrow as pa
+
+    cache_dir = get_cache_dir(cache_dir)
+    digest = file_hash(source)
+    path = artifact_path(digest, cache_dir)
+    rows = None
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        writer = None
+        rows = 0
+        try:
+            for chunk in iter_deck_chunks(source, chunk_size):
+                if writer is None:
+                    schema = pa.schema([(column, pa.string()) for column in chunk.columns])
+                    writer = pa.ipc.new_file(tmp_path, schema)  # 압축하지 않은 Arrow 파일 (메모리 매핑 가능)
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            raise ValueError(f"{source}: 단어가 없습니다.")
+        os.replace(tmp_path, path)
+
+    # 앱에서 같은 경로를 VOCAB_SOURCE로 지정하면 파싱 없이 이 파일을 사용
+    manifest = _read_manifest(cache_dir)
+    if manifest.get(source, {}).get("sha256") != digest:
+        manifest[source] = {"sha256": digest, "etag": None}
+        _write_manifest(cache_dir, manifest)
+    return digest, path, rows
+
+def compile_neighbors(digest, cache_dir=None): # 변환한 단어장으로 헷갈리는 보기 인덱스를 만들고 경로 반환 (이미 있으면 그대로)
+    from utils.confusable_utils import build_neighbors, write_neighbors
+
+    path = neighbors_path(digest, cache_dir)
+    if not os.path.exists(path):
+        dataframe = read_artifact(artifact_path(digest, cache_dir))
+        write_neighbors(build_neighbors(dataframe["Word"].to_numpy(object), dataframe["Meaning"].to_numpy(object)), path)
+    return path
+
+def load_vocabulary(source, cache_dir=None): # 단어장 불러오기 (내용이 바뀌었을 때만 xlsx 파싱)
+    _, path = compile_vocabulary(source, cache_dir)
+    return read_artifact(path)
+
+
+class Vocabulary: # 프로세스 전체에서 공유하는 읽기 전용 단어장 (단어 id = 행 번호)
+    def __init__(self, data):
+        self.data = data.reset_index(drop=True)
+        self.words = self._interned(self.data["Word"])
+        self.meanings = self._interned(self.data["Meaning"])
+        self.days = self._interned(self.data["Day"]) if "Day" in self.data.columns else None
+        self.id_of = {word: word_id for word_id, word in enumerate(self.words)}  # 같은 단어가 여러 번 나오면 마지막 행
+        self.duplicate_ids = self._duplicate_index(self.words)
+        self.all_ids = np.arange(len(self.words), dtype=np.int32)
+        self.day_names, self.day_ids = self._day_index(self.days)
+        for array in (self.words, self.meanings, self.days, self.all_ids):
+            if array is not None:
+                array.flags.writeable = False
+
+    @staticmethod
+    def _interned(column): # 같은 문자열은 한 객체만 쓰도록 intern 한 object 배열
+        return np.array([sys.intern(value) if isinstance(value, str) else value for value in column],
+                        dtype=object)
+
+    @staticmethod
+    def _duplicate_index(words): # 여러 행에 나오는 단어 -> 그 단어의 id 목록 (예: 다른 Day에 다시 나온 단어)
+        ids = {}
+        for word_id, word in enumerate(words):
+            ids.setdefault(word, []).append(word_id)
+        return {word: word_ids for word, word_ids in ids.items() if len(word_ids) > 1}
+
+    @staticmethod
+    def _day_index(days): # Day 목록(처음 나온 순서)과 Day -> 단어 id 배열 (불러올 때 한 번만 만듦)
+        if days is None:
+            return [], {}
+        codes, names = pd.factorize(days)  # 빈 Day는 -1
+        order = np.argsort(codes, kind="stable").astype(np.int32)  # Day별로 모은 단어 id (Day 안에서는 원래 순서)
+        order.flags.writeable = False
+        bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+        # 각 Day의 id 배열은 order 하나를 나눠 보는 view (복사하지 않음)
+        return list(names), {name: order[bounds[i]:bounds[i + 1]] for i, name in enumerate(names)}
+
+    def __len__(self):
+        return len(self.words)
+
+    def select(self, days=None): # 선택한 Day들의 단어 id (원래 순서), Day를 고르지 않으면 전체
+        if not days or self.days is None:
+            return self.all_ids
+        parts = [self.day_ids[day] for day in days if day in self.day_ids]
+        if not parts:
+            return np.empty(0, dtype=np.int32)
+        if len(parts) == 1:
+            return parts[0]  # 인덱스의 view를 그대로 사용
+        return np.sort(np.concatenate(parts))
+
+    def find(self, row): # 행(Word/Meaning/Day)과 같은 단어장 행의 id, 단어가 없거나 뜻이 다르면 None
+        word_id = self.id_of.get(row.get("Word"))
+        if word_id is None:
+            return None
+        candidates = self.duplicate_ids.get(row["Word"], (word_id,))
+        meaning, day = str(row.get("Meaning")), str(row.get("Day"))
+        same_meaning = [i for i in candidates if str(self.meanings[i]) == meaning]
+        for i in same_meaning:
+            if self.days is None or str(self.days[i]) == day:
+                return i
+        return same_meaning[0] if same_meaning else None
+
+    def row(self, word_id): # 단어 id -> {"Day", "Word", "Meaning"}
+        return {
+            "Day": self.days[word_id] if self.days is not None else "Unspecified",
+            "Word": self.words[word_id],
+            "Meaning": self.meanings[word_id],
+        }
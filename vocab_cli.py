@@ -0,0 +1,89 @@
+import argparse
+import sys
+
+from utils.vocab_utils import (DEFAULT_CHUNK_SIZE,
+                               compile_neighbors,
+                               compile_vocabulary,
+                               import_deck)
+from utils.storage_utils import (NamespacedStorage,
+                                 create_storage,
+                                 user_namespace)
+from utils.event_log_utils import (TRANSFER_CHUNK_SIZE,
+                                   export_progress,
+                                   import_progress)
+
+
+def build(args): # 단어장을 미리 Arrow 파일로 변환 (배포 시 빌드 단계에서 실행)
+    for source in args.sources:
+        digest, path = compile_vocabulary(source, args.cache_dir)
+        neighbors = compile_neighbors(digest, args.cache_dir)  # 헷갈리는 보기 인덱스도 함께 미리 만듦
+        print(f"{source}\n  sha256: {digest}\n  artifact: {path}\n  neighbors: {neighbors}")
+
+def import_decks(args): # 여러 xlsx/CSV 단어장을 청크 단위로 읽어 로컬 단어장 캐시(Arrow)에 저장
+    for source in args.sources:
+        digest, path, rows = import_deck(source, args.cache_dir, args.chunk_size)
+        neighbors = compile_neighbors(digest, args.cache_dir)
+        status = f"{rows}개 단어" if rows is not None else "이미 가져온 단어장"
+        print(f"{source} ({status})\n  sha256: {digest}\n  artifact: {path}\n  neighbors: {neighbors}")
+
+
+def user_storage(args): # 명령줄에서 지정한 사용자의 저장 영역
+    return NamespacedStorage(create_storage(args.backend), user_namespace(args.user))
+
+def export_user_progress(args): # 사용자의 오답/마크/학습 기록을 JSON Lines로 내보냄
+    storage = user_storage(args)
+    if args.output == "-":
+        count = export_progress(storage, sys.stdout, args.chunk_size)
+    else:
+        with open(args.output, "w", encoding="utf-8") as out:
+            count = export_progress(storage, out, args.chunk_size)
+    print(f"{count}줄을 내보냈습니다.", file=sys.stderr)
+
+def import_user_progress(args): # 내보낸 JSON Lines를 사용자의 기록에 병합
+    storage = user_storage(args)
+    if args.input == "-":
+        counts = import_progress(storage, sys.stdin, args.chunk_size)
+    else:
+        with open(args.input, encoding="utf-8") as lines:
+            counts = import_progress(storage, lines, args.chunk_size)
+    print(f"오답 {counts['incorrect']}개, 마크 {counts['marked']}개, 이벤트 {counts['event']}개를 가져왔습니다.",
+          file=sys.stderr)
+
+
+def add_storage_arguments(parser): # 학습 기록 내보내기/가져오기 공통 옵션
+    parser.add_argument("--user", default="", help="사용자 ID (비워 두면 공용 기록)")
+    parser.add_argument("--backend", help="저장소 백엔드 drive/local (기본값: STORAGE_BACKEND)")
+    parser.add_argument("--chunk-size", type=int, default=TRANSFER_CHUNK_SIZE, help="한 번에 다루는 행/이벤트/로그 조각 수")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="단어장 관리 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="단어장(xlsx)을 Arrow 파일로 미리 변환")
+    build_parser.add_argument("sources", nargs="+", help="xlsx 파일 경로 또는 URL")
+    build_parser.add_argument("--cache-dir", help="Arrow 파일 저장 위치 (기본값: VOCAB_CACHE_DIR 또는 .vocab_cache)")
+    build_parser.set_defaults(func=build)
+
+    decks_parser = subparsers.add_parser("import-decks", help="여러 단어장(xlsx/CSV)을 청크 단위로 읽어 로컬 캐시에 저장")
+    decks_parser.add_argument("sources", nargs="+", help="로컬 xlsx/CSV 파일 경로 (Word, Meaning 열 필수, Day 열 선택)")
+    decks_parser.add_argument("--cache-dir", help="Arrow 파일 저장 위치 (기본값: VOCAB_CACHE_DIR 또는 .vocab_cache)")
+    decks_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="한 번에 읽을 행 수")
+    decks_parser.set_defaults(func=import_decks)
+
+    export_parser = subparsers.add_parser("export-progress", help="사용자의 학습 기록을 JSON Lines로 내보내기")
+    export_parser.add_argument("-o", "--output", default="-", help="저장할 파일 (기본값: 표준 출력)")
+    add_storage_arguments(export_parser)
+    export_parser.set_defaults(func=export_user_progress)
+
+    import_parser = subparsers.add_parser("import-progress", help="내보낸 학습 기록을 사용자의 기록에 병합")
+    import_parser.add_argument("input", nargs="?", default="-", help="가져올 파일 (기본값: 표준 입력)")
+    add_storage_arguments(import_parser)
+    import_parser.set_defaults(func=import_user_progress)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())